@@ -0,0 +1,164 @@
+"""Numeric kernels for trace processing, compiled with Numba when it is installed."""
+import warnings
+import numpy as np
+
+try:
+    from numba import njit, prange
+    HAVE_NUMBA = True
+except ImportError:
+    HAVE_NUMBA = False
+
+
+def column_means(arr):
+    """Column means of a 2D array, skipping NaN like pandas' Series.mean()."""
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)  # all-NaN columns give NaN
+        return np.nanmean(arr, axis=0, dtype=arr.dtype)
+
+
+if HAVE_NUMBA:
+    # No 'nnan' fast-math flag: the kernel has to see NaN samples to skip them
+    @njit(parallel=True, fastmath={'reassoc', 'contract', 'arcp'}, cache=True)
+    def dff_kernel(arr, start, end, out):
+        """
+        Write ΔF/F₀ (%) of each column of arr into out, with F₀ the mean of rows
+        start:end. Columns with a zero baseline are copied unchanged.
+        Returns the F₀ of every column.
+        """
+        n, k = arr.shape
+        f0 = np.empty(k, dtype=arr.dtype)
+        if n == 0:
+            # No rows to average; the baseline range may still point past the end
+            f0[:] = np.nan
+            return f0
+
+        for j in prange(k):
+            # Mean of the baseline period, skipping NaN
+            total = 0.0
+            count = 0
+            for i in range(start, end):
+                v = arr[i, j]
+                if v == v:
+                    total += v
+                    count += 1
+            m = total / count if count > 0 else np.nan
+            f0[j] = m
+
+            if m != 0:
+                inv = 100.0 / m
+                for i in range(n):
+                    out[i, j] = (arr[i, j] - m) * inv
+            else:
+                for i in range(n):
+                    out[i, j] = arr[i, j]
+
+        return f0
+
+    @njit(cache=True)
+    def m4_indices(x, y, x_lo, x_hi, n_bins):
+        """
+        Indices of the first, last, minimum and maximum sample of each of n_bins
+        bins over [x_lo, x_hi], in sample order and each once. x must be sorted;
+        samples outside the range get bins of their own. NaN samples are skipped
+        as minimum or maximum.
+        """
+        n = len(x)
+        out = np.empty(4 * (n_bins + 2), dtype=np.intp)
+        count = 0
+        scale = n_bins / (x_hi - x_lo)
+
+        i = 0
+        while i < n:
+            b = min(max(np.floor((x[i] - x_lo) * scale), -1), n_bins)
+            first = i
+            lowest = -1
+            highest = -1
+
+            # Scan the samples of this bin
+            j = i
+            while j < n and min(max(np.floor((x[j] - x_lo) * scale), -1), n_bins) == b:
+                v = y[j]
+                if v == v:
+                    if lowest < 0 or v < y[lowest]:
+                        lowest = j
+                    if highest < 0 or v > y[highest]:
+                        highest = j
+                j += 1
+
+            if lowest < 0:  # Only NaN in this bin
+                lowest = highest = first
+
+            # first <= min(lowest, highest) <= max(lowest, highest) <= last
+            for idx in (first, min(lowest, highest), max(lowest, highest), j - 1):
+                if count == 0 or out[count - 1] != idx:
+                    out[count] = idx
+                    count += 1
+            i = j
+
+        return out[:count]
+else:
+    def dff_kernel(arr, start, end, out):
+        """
+        Write ΔF/F₀ (%) of each column of arr into out, with F₀ the mean of rows
+        start:end. Columns with a zero baseline are copied unchanged.
+        Returns the F₀ of every column.
+        """
+        f0 = column_means(arr[start:end])
+        valid = f0 != 0
+
+        np.subtract(arr, np.where(valid, f0, 0), out=out)
+        np.multiply(out, np.where(valid, 100 / np.where(valid, f0, 1), 1), out=out)
+        return f0
+
+    def m4_indices(x, y, x_lo, x_hi, n_bins):
+        """
+        Indices of the first, last, minimum and maximum sample of each of n_bins
+        bins over [x_lo, x_hi], in sample order and each once. x must be sorted;
+        samples outside the range get bins of their own. NaN samples are skipped
+        as minimum or maximum.
+        """
+        # Bin of every sample, non-decreasing as x is sorted
+        bins = np.floor((x - x_lo) * (n_bins / (x_hi - x_lo))).astype(np.intp)
+        np.clip(bins, -1, n_bins, out=bins)
+
+        first = np.flatnonzero(np.diff(bins, prepend=bins[0] - 1))
+        last = np.append(first[1:], len(x)) - 1
+        owner = np.repeat(np.arange(len(first)), last - first + 1)
+
+        # fmin/fmax skip NaN; bins of only NaN fall back to their first sample
+        lowest = _first_match(y, np.fmin.reduceat(y, first), owner, first)
+        highest = _first_match(y, np.fmax.reduceat(y, first), owner, first)
+
+        idx = np.sort(np.stack([first, lowest, highest, last], axis=1), axis=1).ravel()
+        return idx[np.diff(idx, prepend=-1) != 0]
+
+    def _first_match(values, targets, owner, default):
+        """Index of the first sample of each bin equal to the bin's target, else default."""
+        pos = np.flatnonzero(values == targets[owner])
+        found = owner[pos]
+        firsts = np.diff(found, prepend=-1) != 0
+
+        result = default.copy()
+        result[found[firsts]] = pos[firsts]
+        return result
+
+
+def warm_up():
+    """Compile the kernels ahead of time so the first normalization is not slowed by JIT."""
+    if HAVE_NUMBA:
+        # Same array types as the read-only blocks cached by DataManager and
+        # the writeable trace stacks built by the plot canvas
+        for writeable in (False, True):
+            arr = np.ones((4, 2), dtype=np.float32, order='F')
+            arr.flags.writeable = writeable
+            dff_kernel(arr, 0, 2, np.empty_like(arr))
+
+        # Time axes (float64) and trace values (float32) are read-only when
+        # they come straight from DataManager, writeable once processed
+        for x_writeable in (False, True):
+            for y_writeable in (False, True):
+                x = np.arange(8.0)
+                y = np.ones(8, dtype=np.float32)
+                x.flags.writeable = x_writeable
+                y.flags.writeable = y_writeable
+                m4_indices(x, y, 0.0, 8.0, 1)
@@ -1,27 +1,234 @@
+import errno
+import functools
+import heapq
+import io
+import logging
+import mmap
 import os
 import re
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
 import pandas as pd
 
+from _kernels import column_means, dff_kernel
+
+logger = logging.getLogger(__name__)
+
+_PANDAS_MAJOR = int(pd.__version__.split('.')[0])
+
+# Optional fast readers: Arrow's multithreaded CSV parser, and the calamine
+# Excel reader (supported by pandas >= 2.2). Fall back to pandas' defaults.
+try:
+    import pyarrow  # noqa: F401
+    _CSV_ENGINE = 'pyarrow'
+except ImportError:
+    _CSV_ENGINE = 'c'
+
+try:
+    import python_calamine  # noqa: F401
+    _EXCEL_ENGINE = 'calamine' if tuple(int(v) for v in pd.__version__.split('.')[:2]) >= (2, 2) else None
+except ImportError:
+    _EXCEL_ENGINE = None
+
+# Suggested row count per chunk for load_file(..., chunksize=...) on CSV files
+# that are too large to read in one go
+CSV_CHUNKSIZE = 1_000_000
+
+# CSV files at least this large are read with O_DIRECT on Linux, in blocks of
+# _DIRECT_IO_BLOCK bytes; this skips the page cache copy on cold loads
+DIRECT_IO_MIN_SIZE = 256 * 1024 * 1024
+_DIRECT_IO_BLOCK = 16 * 1024 * 1024
+
+# Excel files are converted once to a Parquet file stored next to them
+# (<file>.cache.parquet), which is memory-mapped on later loads
+EXCEL_CACHE_SUFFIX = '.cache.parquet'
+
+# Trace columns look like Mean(SEGMENT_TYPE)(l/r), e.g. Mean(a1l) or Mean(t2r)
+_SEG_RE = re.compile(r'Mean\((.*?)([lr])\)')
+
+# Runs of digits inside segment names, for natural sorting
+_DIGITS_RE = re.compile(r'(\d+)')
+
+# Filename suffixes that mark a recording region (soma, axon, etc.)
+_REGIONS = frozenset({'soma', 'axon', 'axons', 'dendrite', 'dendrites', 'dend', 'spine', 'spines', 'mix'})
+
+
+def _parse_mean_col(col):
+    """
+    Split a trace column name into (segment, side).
+    Example: 'Mean(a1l)' -> ('a1', 'l'). Returns None for non-trace columns.
+    """
+    if not isinstance(col, str) or 'Mean(' not in col:
+        return None
+    
+    # Fast path for the usual exact shape Mean(XYl) / Mean(XYr); inner text
+    # with parentheses, e.g. 'Mean(a1r) (control)', is left to the regex
+    if col.startswith('Mean(') and col.endswith(')'):
+        inner = col[5:-1]
+        if (len(inner) > 1 and inner[-1] in ('l', 'r')
+                and ')' not in inner and '(' not in inner):
+            return inner[:-1], inner[-1]
+    
+    # Fall back to the regex for names with extra text around the pattern
+    match = _SEG_RE.search(col)
+    if match:
+        return match.group(1), match.group(2)
+    return None
+
+
+@functools.lru_cache(maxsize=1024)
+def _split_filename(filename):
+    """(sample, region) parsed from a filename; see DataManager.parse_filename."""
+    # Remove file extension
+    base_name = os.path.splitext(filename)[0]
+
+    # Try to identify common patterns like sample_region
+    parts = base_name.split('_')
+
+    # Check if the last part indicates a region (soma, axon, etc.)
+    last = parts[-1].lower()
+    if last in _REGIONS:
+        return '_'.join(parts[:-1]), last
+
+    # If no region found, use the whole filename as sample name
+    return base_name, None
+
+
+def _natural_key(text):
+    """Sort key that orders embedded numbers numerically ('a2' before 'a10')."""
+    parts = _DIGITS_RE.split(text)
+    parts[1::2] = [int(part) for part in parts[1::2]]
+    return parts, text  # Fall back to plain text order for ties like 'a01'/'a1'
+
+
+def _copy_on_write_enabled():
+    """Check whether pandas copy-on-write is active (always on from pandas 3.0)."""
+    if _PANDAS_MAJOR >= 3:
+        return True
+    try:
+        return pd.get_option('mode.copy_on_write') is True
+    except KeyError:
+        return False  # pandas < 1.5
+
+
+def _read_direct(file_path):
+    """
+    Read a whole file with O_DIRECT into a page-aligned buffer (Linux only).
+    Returns a BytesIO with the contents, or None if direct I/O is not supported
+    by the platform or filesystem.
+    """
+    if not sys.platform.startswith('linux') or not hasattr(os, 'O_DIRECT'):
+        return None
+    unsupported = (errno.EINVAL, errno.ENOTSUP, errno.EOPNOTSUPP, errno.ENOSYS)
+    
+    try:
+        fd = os.open(file_path, os.O_RDONLY | os.O_DIRECT)
+    except OSError as e:
+        if e.errno in unsupported:
+            return None
+        raise
+    
+    try:
+        size = os.fstat(fd).st_size
+        # O_DIRECT needs aligned buffers and lengths; anonymous maps are page aligned
+        buf_size = max(mmap.PAGESIZE, -(-size // mmap.PAGESIZE) * mmap.PAGESIZE)
+        with mmap.mmap(-1, buf_size) as buf:
+            view = memoryview(buf)
+            try:
+                offset = 0
+                while offset < size:
+                    n = os.readv(fd, [view[offset:offset + _DIRECT_IO_BLOCK]])
+                    if n == 0:
+                        break
+                    offset += n
+                return io.BytesIO(view[:offset])
+            except OSError as e:
+                if e.errno in unsupported:
+                    return None
+                raise
+            finally:
+                view.release()
+    finally:
+        os.close(fd)
+
+
 class DataManager:
     """Manages loading and processing of data files."""
     
     def __init__(self):
         self.loaded_files = {}  # Dictionary to store loaded files {file_path: {metadata}}
-        self.sampling_freq = 5.0  # Default sampling frequency in Hz
+        self._sampling_freq = 5.0  # Default sampling frequency in Hz
+        self._t_cache = {}  # {(n_samples, sampling_freq): time array}
+        
+        # Files already read, so unchanged files are not parsed again. read_file
+        # runs in worker threads, so both caches are only touched under the lock.
+        self._cache_lock = threading.Lock()
+        self._file_cache = {}  # {file_path: ((mtime, size, chunksize), file_data)}
+        self._segments_cache = {}  # {tuple of column names: segments}
+        self._samples = None  # Sorted sample names, rebuilt after files are added
+    
+    @property
+    def sampling_freq(self):
+        """Sampling frequency in Hz used for files without a Time column."""
+        return self._sampling_freq
+    
+    @sampling_freq.setter
+    def sampling_freq(self, value):
+        # Time arrays for the old frequency are not needed any more
+        if value != self._sampling_freq:
+            self._t_cache.clear()
+        self._sampling_freq = value
+    
+    def get_time_array(self, n_samples, sampling_freq=None):
+        """
+        Get a read-only time array of n_samples at sampling_freq (default: the
+        current one). Traces of the same length share one array.
+        """
+        if sampling_freq is None:
+            sampling_freq = self.sampling_freq
+        
+        key = (n_samples, sampling_freq)
+        t = self._t_cache.get(key)
+        if t is None:
+            t = self._t_cache[key] = np.arange(n_samples) / sampling_freq
+            t.flags.writeable = False
+        return t
     
-    def load_file(self, file_path, sampling_freq=None):
-        """Load data from Excel or CSV file."""
+    def load_file(self, file_path, sampling_freq=None, chunksize=None):
+        """
+        Load data from Excel or CSV file.
+        If chunksize is given, CSV files are streamed in chunks of that many rows
+        and only the time and trace columns are kept (see CSV_CHUNKSIZE).
+        """
+        file_data = self.read_file(file_path, sampling_freq, chunksize)
+        self.add_file(file_path, file_data)
+        return file_path
+    
+    def read_file(self, file_path, sampling_freq=None, chunksize=None):
+        """
+        Read a file and build its metadata without registering it.
+        Safe to call from worker threads; pass the result to add_file().
+        """
         try:
             # Use the current sampling frequency if not specified
             if sampling_freq is None:
                 sampling_freq = self.sampling_freq
             
+            # Reuse the previous read if the file has not changed on disk
+            stat = os.stat(file_path)
+            signature = (stat.st_mtime, stat.st_size, chunksize)
+            with self._cache_lock:
+                cached = self._file_cache.get(file_path)
+            if cached is not None and cached[0] == signature:
+                return dict(cached[1], sampling_freq=sampling_freq)
+            
             # Load the file based on extension
             if file_path.lower().endswith('.xlsx') or file_path.lower().endswith('.xls'):
-                df = pd.read_excel(file_path)
+                df = self._read_excel(file_path)
             elif file_path.lower().endswith('.csv'):
-                df = pd.read_csv(file_path)
+                df = self._read_csv(file_path, chunksize)
             else:
                 raise ValueError("Unsupported file format. Please use Excel or CSV files.")
             
@@ -30,28 +237,160 @@ class DataManager:
             file_info = self.parse_filename(file_name)
             
             # Analyze columns to find segment/side information
-            segments = self.identify_segments(df)
+            segments = self.identify_segments(df.columns)
+            segment_names = self._extract_segment_names(df.columns)
+            segment_index = self._build_segment_index(df.columns)
+            
+            # Cache the signal columns as one float32 block for the normalizers
+            numeric_idx, numeric_arr = self._build_numeric_cache(df)
             
-            # Store the dataframe with metadata
-            self.loaded_files[file_path] = {
-                'df': df.copy(),
+            # Per-column float32 arrays handed to the plot canvas instead of the frame
+            trace_arrays = self._build_trace_arrays(df, segment_index, numeric_idx, numeric_arr)
+            
+            # Build the dataframe with metadata. 'df' and 'original' share the
+            # same frame; nothing mutates it in place (processing always works
+            # on copies), and copy-on-write keeps it that way.
+            file_data = {
+                'df': df,
                 'name': file_name,
                 'info': file_info,
+                'region': file_info.get('region', ''),
                 'sampling_freq': sampling_freq,
-                'original': df.copy(),  # Keep an original copy for reference
-                'segments': segments
+                'original': df,  # Original data for reference
+                'segments': segments,
+                'segment_names': segment_names,  # Unique, naturally sorted
+                'index': segment_index,  # {(segment, side): [columns]}
+                'numeric_idx': numeric_idx,  # Positions of the signal columns in df
+                'numeric_arr': numeric_arr,  # Read-only float32 copy of those columns
+                'arrays': trace_arrays,  # {column: float32 values} for every segment column
+                'time': df['Time'].to_numpy() if 'Time' in df.columns else None,
+                'n_samples': len(df)
             }
             
-            print(f"Loaded file: {file_name}")
-            print(f"Found segments: {segments}")
+            with self._cache_lock:
+                self._file_cache[file_path] = (signature, file_data)
+            
+            logger.debug("Loaded file: %s", file_name)
+            logger.debug("Found segments: %s", segments)
             
-            return file_path
+            return file_data
         
         except Exception as e:
             raise ValueError(f"Error loading file: {str(e)}")
     
-    def identify_segments(self, df):
-        """Identify segment names, types, and sides from column names."""
+    def add_file(self, file_path, file_data):
+        """Register a file read by read_file()."""
+        self.loaded_files[file_path] = file_data
+        self._samples = None
+    
+    def read_files(self, file_paths, sampling_freq=None, chunksize=None, max_workers=None):
+        """
+        Read several files in parallel threads (pandas releases the GIL while parsing).
+        Yields (file_path, file_data, error) in the order of file_paths, where
+        error is None on success and file_data is None on failure.
+        """
+        if sampling_freq is None:
+            sampling_freq = self.sampling_freq
+        
+        def read_one(file_path):
+            try:
+                return file_path, self.read_file(file_path, sampling_freq, chunksize), None
+            except ValueError as e:
+                return file_path, None, str(e)
+        
+        # Closing the generator early cancels the reads that have not started
+        executor = ThreadPoolExecutor(max_workers=max_workers or os.cpu_count())
+        try:
+            yield from executor.map(read_one, file_paths)
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+    
+    def _read_csv(self, file_path, chunksize=None):
+        """Read a CSV file, using the pyarrow engine when it is installed."""
+        if chunksize:
+            return self._read_csv_chunked(file_path, chunksize)
+        
+        # Large files are usually not in the page cache; read them with direct I/O
+        source = file_path
+        if os.path.getsize(file_path) >= DIRECT_IO_MIN_SIZE:
+            source = _read_direct(file_path) or file_path
+        
+        if _CSV_ENGINE == 'pyarrow':
+            try:
+                return pd.read_csv(source, engine='pyarrow')
+            except ValueError:
+                # The Arrow parser is stricter (e.g. ragged rows); retry with the C engine
+                if hasattr(source, 'seek'):
+                    source.seek(0)
+        
+        # The C engine reads a file path through a memory map instead of buffered reads
+        return pd.read_csv(source, memory_map=not hasattr(source, 'read'))
+    
+    def _read_csv_chunked(self, file_path, chunksize):
+        """Stream a CSV file in chunks, keeping only time and trace columns."""
+        # Decide which columns to keep from the header alone
+        header = pd.read_csv(file_path, nrows=0).columns
+        keep_cols = [
+            col for col in header
+            if 'Time' in col or _parse_mean_col(col)
+        ]
+        if not keep_cols:
+            raise ValueError("No time or trace columns found in file.")
+        
+        # The pyarrow engine does not support chunked reading
+        reader = pd.read_csv(file_path, usecols=keep_cols, chunksize=chunksize, memory_map=True)
+        with reader:
+            return pd.concat(reader, ignore_index=True)
+    
+    def _read_excel(self, file_path):
+        """
+        Read an Excel file, using the calamine engine when it is installed.
+        The default openpyxl reader already opens workbooks read-only.
+        Reuses the Parquet copy written next to the file on a previous load.
+        """
+        cache_path = file_path + EXCEL_CACHE_SUFFIX
+        source_mtime = os.stat(file_path).st_mtime_ns
+        
+        # The cache is stamped with the Excel file's mtime when written
+        if _CSV_ENGINE == 'pyarrow' and os.path.exists(cache_path):
+            if os.stat(cache_path).st_mtime_ns == source_mtime:
+                try:
+                    return pd.read_parquet(cache_path, engine='pyarrow', memory_map=True)
+                except Exception as e:
+                    logger.debug("Ignoring unreadable cache %s: %s", cache_path, e)
+        
+        if _EXCEL_ENGINE:
+            df = pd.read_excel(file_path, engine=_EXCEL_ENGINE)
+        else:
+            df = pd.read_excel(file_path)
+        
+        if _CSV_ENGINE == 'pyarrow':
+            self._write_excel_cache(df, cache_path, source_mtime)
+        return df
+    
+    def _write_excel_cache(self, df, cache_path, source_mtime):
+        """Write the Parquet copy of an Excel file; failures only skip caching."""
+        tmp_path = cache_path + '.tmp'
+        try:
+            df.to_parquet(tmp_path, engine='pyarrow', compression='zstd')
+            os.utime(tmp_path, ns=(source_mtime, source_mtime))
+            os.replace(tmp_path, cache_path)
+        except Exception as e:
+            # e.g. read-only folder, or columns Parquet cannot store
+            logger.debug("Could not write cache %s: %s", cache_path, e)
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+    
+    def identify_segments(self, columns):
+        """Identify segment names, types, and sides from column names (e.g. df.columns)."""
+        # The result only depends on the column names, so files with the same
+        # layout share one scan
+        key = tuple(columns)
+        with self._cache_lock:
+            cached = self._segments_cache.get(key)
+        if cached is not None:
+            return {group: list(cols) for group, cols in cached.items()}
+        
         segments = {
             'all': [],
             'left': [],
@@ -62,20 +401,15 @@ class DataManager:
         # e.g., Mean(a1l) for left side of segment a1
         # e.g., Mean(t2r) for right side of segment t2
         
-        for col in df.columns:
-            # Skip non-signal columns like 'Time'
-            if isinstance(col, str) and 'Time' in col:
-                continue
-                
-            # Check if column is a string
-            if not isinstance(col, str):
+        # Only string columns can be signal columns; skip non-signal ones like 'Time'
+        for col in key:
+            if not isinstance(col, str) or 'Time' in col:
                 continue
-                
+            
             # Look for pattern Mean(XYl) or Mean(XYr) where XY is segment name
-            match = re.search(r'Mean\((.*?)([lr])\)', col)
-            if match:
-                segment = match.group(1)  # e.g., 'a1', 't2'
-                side = match.group(2)     # 'l' or 'r'
+            parsed = _parse_mean_col(col)
+            if parsed:
+                segment, side = parsed  # e.g., ('a1', 'l')
                 
                 # Add to appropriate lists
                 segments['all'].append(col)
@@ -83,19 +417,20 @@ class DataManager:
                     segments['left'].append(col)
                 else:
                     segments['right'].append(col)
-            else:
-                # Look for other common patterns in your data
+            elif not col.startswith('Unnamed:'):
                 # If none of the patterns match but it's a data column, add it to all
-                if 'Time' not in col and not col.startswith('Unnamed:'):
-                    segments['all'].append(col)
+                segments['all'].append(col)
         
-        # Sort segments for consistent ordering
-        segments['all'].sort()
-        segments['left'].sort()
-        segments['right'].sort()
+        # Sort segments for consistent ordering (a2 before a10)
+        segments['all'].sort(key=_natural_key)
+        segments['left'].sort(key=_natural_key)
+        segments['right'].sort(key=_natural_key)
         
-        # Print segments found for debugging
-        print(f"Identified segments: {segments}")
+        # Log segments found for debugging
+        logger.debug("Identified segments: %s", segments)
+        
+        with self._cache_lock:
+            self._segments_cache[key] = {group: list(cols) for group, cols in segments.items()}
         
         return segments
     
@@ -104,26 +439,7 @@ class DataManager:
         Parse useful information from filename.
         Example: RP3_May_14_n5_soma.xlsx -> {'sample': 'RP3_May_14_n5', 'region': 'soma'}
         """
-        # Remove file extension
-        base_name = os.path.splitext(filename)[0]
-        
-        # Try to identify common patterns like sample_region
-        parts = base_name.split('_')
-        
-        # Check if the last part indicates a region (soma, axon, etc.)
-        common_regions = ['soma', 'axon', 'axons', 'dendrite', 'dendrites', 'dend', 'spine', 'spines', 'mix']
-        region = None
-        
-        for r in common_regions:
-            if parts[-1].lower() == r:
-                region = parts[-1].lower()
-                sample = '_'.join(parts[:-1])
-                break
-        
-        # If no region found, use the whole filename as sample name
-        if region is None:
-            sample = base_name
-        
+        sample, region = _split_filename(filename)
         return {
             'sample': sample,
             'region': region
@@ -144,11 +460,12 @@ class DataManager:
     
     def get_samples(self):
         """Get unique sample names from loaded files."""
-        samples = set()
-        for file_path in self.loaded_files:
-            sample = self.loaded_files[file_path]['info']['sample']
-            samples.add(sample)
-        return sorted(list(samples))
+        # Sample names are parsed at load time; only the sorted list is cached
+        if self._samples is None:
+            self._samples = sorted(dict.fromkeys(
+                file_data['info']['sample'] for file_data in self.loaded_files.values()
+            ))
+        return list(self._samples)
     
     def get_files_by_sample(self, sample):
         """Get all files for a given sample."""
@@ -157,51 +474,45 @@ class DataManager:
             if self.loaded_files[file_path]['info']['sample'] == sample
         ]
     
+    def _extract_segment_names(self, columns):
+        """Get the unique segment names (e.g. 'a1', 't2') in columns, naturally sorted."""
+        parsed = (_parse_mean_col(col) for col in columns)
+        names = dict.fromkeys(segment for segment, _ in filter(None, parsed))
+        return tuple(sorted(names, key=_natural_key))
+    
     def get_segment_names(self, file_paths):
         """Extract unique segment names from the given files."""
-        segments = set()
-        
-        pattern = r'Mean\((.*?)([lr])\)'
-        
-        for file_path in file_paths:
-            if file_path in self.loaded_files:
-                file_data = self.loaded_files[file_path]
-                df = file_data['df']
-                
-                for col in df.columns:
-                    if isinstance(col, str):
-                        match = re.search(pattern, col)
-                        if match:
-                            segment_name = match.group(1)  # e.g., 'a1', 't2'
-                            segments.add(segment_name)
+        # Each file's names are sorted at load time, so merge them in order
+        # and drop the duplicates
+        per_file = [
+            self.loaded_files[file_path]['segment_names']
+            for file_path in file_paths if file_path in self.loaded_files
+        ]
+        segments = list(dict.fromkeys(heapq.merge(*per_file, key=_natural_key)))
         
-        # Print found segments for debugging
-        print(f"Found {len(segments)} segments across selected files: {sorted(list(segments))}")
+        # Log found segments for debugging
+        logger.debug("Found %d segments across selected files: %s", len(segments), segments)
         
-        return sorted(list(segments))
+        return segments
+    
+    def _build_segment_index(self, columns):
+        """Map each (segment, side) pair, e.g. ('a1', 'l'), to its trace columns."""
+        index = {}
+        for col in columns:
+            parsed = _parse_mean_col(col)
+            if parsed:
+                index.setdefault(parsed, []).append(col)
+        return index
     
     def get_columns_for_segment(self, file_path, segment_name, side=None):
         """Get column names for a specific segment and optionally side."""
         if file_path not in self.loaded_files:
             return []
-            
-        df = self.loaded_files[file_path]['df']
-        columns = []
         
-        pattern = r'Mean\((.*?)([lr])\)'
-        
-        for col in df.columns:
-            if isinstance(col, str):
-                match = re.search(pattern, col)
-                if match:
-                    col_segment = match.group(1)
-                    col_side = match.group(2)
-                    
-                    if col_segment == segment_name:
-                        if side is None or col_side == side:
-                            columns.append(col)
-        
-        return columns
+        index = self.loaded_files[file_path]['index']
+        if side is not None:
+            return list(index.get((segment_name, side), []))
+        return index.get((segment_name, 'l'), []) + index.get((segment_name, 'r'), [])
     
     def get_all_segments(self, file_paths):
         """
@@ -211,29 +522,12 @@ class DataManager:
         # Dictionary to hold segment information
         all_segments = {}
         
-        # Regex pattern for extracting segment name and side
-        pattern = r'Mean\((.*?)([lr])\)'
-        
-        # Process each file
+        # Merge the per-file (segment, side) indices built at load time
         for file_path in file_paths:
             if file_path not in self.loaded_files:
                 continue
-                
-            file_data = self.loaded_files[file_path]
-            df = file_data['df']
             
-            # Process each column in the dataframe
-            for col in df.columns:
-                if not isinstance(col, str):
-                    continue
-                    
-                match = re.search(pattern, col)
-                if not match:
-                    continue
-                    
-                segment_name = match.group(1)  # e.g., 'a1', 't2'
-                side = match.group(2)          # 'l' or 'r'
-                
+            for (segment_name, side), columns in self.loaded_files[file_path]['index'].items():
                 # Initialize this segment if not already in the dictionary
                 if segment_name not in all_segments:
                     all_segments[segment_name] = {
@@ -241,58 +535,205 @@ class DataManager:
                         'right': []
                     }
                 
-                # Add this trace to the appropriate side
+                # Add these traces to the appropriate side
                 side_key = 'left' if side == 'l' else 'right'
-                all_segments[segment_name][side_key].append({
-                    'file_path': file_path,
-                    'column': col
-                })
+                all_segments[segment_name][side_key].extend(
+                    {'file_path': file_path, 'column': col} for col in columns
+                )
         
         return all_segments
     
-    def normalize_by_mean(self, df):
-        """Normalize all signal columns by their mean values."""
-        normalized_df = df.copy()
-        numeric_columns = normalized_df.select_dtypes(include=[np.number]).columns
+    def get_time_values(self, file_path):
+        """Get the time axis of a loaded file: its Time column, or one built from the sampling frequency."""
+        file_data = self.loaded_files[file_path]
+        if file_data['time'] is not None:
+            return file_data['time']
+        return self.get_time_array(file_data['n_samples'])
+    
+    def _signal_columns(self, df):
+        """Get the numeric signal columns of a DataFrame (everything except time)."""
+        numeric_columns = df.select_dtypes(include=[np.number]).columns
+        mask = [isinstance(col, str) and 'Time' not in col for col in numeric_columns]
+        return numeric_columns[mask]
+    
+    def _build_numeric_cache(self, df):
+        """
+        Get positions of the signal columns and their values as a float32 block.
+        The block is column-major so each column is a contiguous, read-only view.
+        """
+        numeric_idx = np.flatnonzero(df.columns.isin(self._signal_columns(df))).tolist()
+        numeric_arr = np.asfortranarray(df.iloc[:, numeric_idx].to_numpy(dtype=np.float32))
+        numeric_arr.flags.writeable = False
+        return numeric_idx, numeric_arr
+    
+    def _build_trace_arrays(self, df, segment_index, numeric_idx, numeric_arr):
+        """
+        Get {column: float32 values} for every segment column. Numeric columns
+        are views of the cached numeric block; anything else is converted,
+        with unparseable entries as NaN.
+        """
+        block_columns = dict(zip(df.columns[numeric_idx], range(len(numeric_idx))))
         
-        for col in numeric_columns:
-            if isinstance(col, str) and 'Time' not in col:  # Skip time column if present
-                mean_value = df[col].mean()
-                if mean_value != 0:
-                    normalized_df[col] = (df[col] / mean_value) * 100
+        trace_arrays = {}
+        for columns in segment_index.values():
+            for col in columns:
+                if col in block_columns:
+                    trace_arrays[col] = numeric_arr[:, block_columns[col]]
                 else:
-                    print(f"Warning: {col} has zero mean, skipping normalization")
+                    values = pd.to_numeric(df[col], errors='coerce').to_numpy(dtype=np.float32)
+                    values.flags.writeable = False
+                    trace_arrays[col] = values
+        return trace_arrays
+    
+    def _file_data_for(self, df):
+        """Get the loaded-file entry whose DataFrame is df, or None."""
+        for file_data in self.loaded_files.values():
+            if file_data['df'] is df:
+                return file_data
+        return None
+    
+    def _signal_block(self, df, file_data=None):
+        """
+        Get (columns, float32 values) of the signal columns of df.
+        Uses the block cached at load time when file_data (df's entry) is given.
+        """
+        if file_data is not None:
+            return df.columns[file_data['numeric_idx']], file_data['numeric_arr']
         
-        return normalized_df
+        columns = self._signal_columns(df)
+        return columns, df[columns].to_numpy(dtype=np.float32)
     
-    def normalize_baseline(self, df, baseline_start, baseline_duration, sampling_freq):
-        """Apply ΔF/F₀ normalization using specified baseline period."""
-        normalized_df = df.copy()
+    def _scratch_buffer(self, file_data, shape):
+        """
+        Get a float32 output buffer for the normalizers. Loaded files keep one
+        between calls, reallocated only when the shape changes. Its contents are
+        copied into the returned frames, so reusing it is safe.
+        """
+        if file_data is None:
+            return np.empty(shape, dtype=np.float32, order='F')
         
+        scratch = file_data.get('scratch')
+        if scratch is None or scratch.shape != shape:
+            scratch = file_data['scratch'] = np.empty(shape, dtype=np.float32, order='F')
+        return scratch
+    
+    def _output_frame(self, df, inplace):
+        """
+        Get the frame the normalizers write into. With copy-on-write the
+        unchanged columns are shared with df instead of deep-copied.
+        """
+        if inplace:
+            return df
+        return df.copy(deep=not _copy_on_write_enabled())
+    
+    def _baseline_range(self, n_samples, baseline_start, baseline_duration, sampling_freq):
+        """Get the (start, end) sample indices of the baseline period."""
         # Convert time to indices
         start_idx = int(baseline_start * sampling_freq)
         end_idx = int((baseline_start + baseline_duration) * sampling_freq)
         
         # Ensure indices are valid
         start_idx = max(0, start_idx)
-        end_idx = min(len(df), end_idx)
+        end_idx = min(n_samples, end_idx)
         
         if start_idx >= end_idx:
-            print(f"Warning: Invalid baseline period ({start_idx}:{end_idx}), using first 10% of data")
+            logger.warning("Invalid baseline period (%d:%d), using first 10%% of data", start_idx, end_idx)
             start_idx = 0
-            end_idx = max(1, int(len(df) * 0.1))
+            end_idx = max(1, int(n_samples * 0.1))
         
-        numeric_columns = normalized_df.select_dtypes(include=[np.number]).columns
+        return start_idx, end_idx
+    
+    def normalize_by_mean(self, df, inplace=False):
+        """
+        Normalize all signal columns by their mean values.
+        Normalized columns are float32. With inplace=True, df itself is modified.
+        """
+        normalized_df = self._output_frame(df, inplace)
+        file_data = None if inplace else self._file_data_for(df)
+        columns, values = self._signal_block(df, file_data)
+        if len(columns) == 0:
+            return normalized_df
         
-        for col in numeric_columns:
-            if isinstance(col, str) and 'Time' not in col:  # Skip time column if present
-                # Calculate F₀ as mean of baseline period
-                f0 = df[col][start_idx:end_idx].mean()
-                
-                if f0 != 0:
-                    # Calculate ΔF/F₀ as percentage
-                    normalized_df[col] = ((df[col] - f0) / f0) * 100
-                else:
-                    print(f"Warning: Zero baseline for {col}, skipping normalization")
+        # Normalize all columns in one pass over the numeric block;
+        # zero-mean columns are divided by 1 and not written back
+        mean_values = column_means(values)
+        valid = mean_values != 0
+        
+        for col in columns[~valid]:
+            logger.warning("%s has zero mean, skipping normalization", col)
+        
+        normalized = self._scratch_buffer(file_data, values.shape)
+        np.multiply(values, 100 / np.where(valid, mean_values, 1), out=normalized)
+        
+        if valid.all():
+            normalized_df[columns] = normalized
+        elif valid.any():
+            normalized_df[columns[valid]] = normalized[:, valid]
+        
+        return normalized_df
+    
+    def normalize_baseline(self, df, baseline_start, baseline_duration, sampling_freq, inplace=False):
+        """
+        Apply ΔF/F₀ normalization using specified baseline period.
+        Normalized columns are float32. With inplace=True, df itself is modified.
+        """
+        normalized_df = self._output_frame(df, inplace)
+        file_data = None if inplace else self._file_data_for(df)
         
-        return normalized_df
\ No newline at end of file
+        start_idx, end_idx = self._baseline_range(len(df), baseline_start, baseline_duration, sampling_freq)
+        
+        columns, values = self._signal_block(df, file_data)
+        if len(columns) == 0:
+            return normalized_df
+        
+        # Calculate ΔF/F₀ (%) for all columns in one pass, with F₀ the mean
+        # of the baseline period; zero-baseline columns are not written back
+        dff = self._scratch_buffer(file_data, values.shape)
+        f0 = dff_kernel(values, start_idx, end_idx, dff)
+        valid = f0 != 0
+        
+        for col in columns[~valid]:
+            logger.warning("Zero baseline for %s, skipping normalization", col)
+        
+        if valid.all():
+            normalized_df[columns] = dff
+        elif valid.any():
+            normalized_df[columns[valid]] = dff[:, valid]
+        
+        return normalized_df
+    
+    def normalize_stack_by_mean(self, stack, labels=None):
+        """
+        Normalize each column of a (samples, traces) stack by its mean value.
+        Returns a new float32 array; zero-mean columns are left unchanged.
+        labels name the columns in warnings.
+        """
+        values = np.asarray(stack, dtype=np.float32)
+        mean_values = column_means(values)
+        valid = mean_values != 0
+        
+        for j in np.flatnonzero(~valid):
+            logger.warning("%s has zero mean, skipping normalization", labels[j] if labels else f"column {j}")
+        
+        return values * np.where(valid, 100 / np.where(valid, mean_values, 1), 1)
+    
+    def compute_dff(self, stack, t0_samples, t1_samples, labels=None):
+        """
+        Calculate ΔF/F₀ (%) of each column of a (samples, traces) stack in one
+        pass, with F₀ the mean of rows t0_samples:t1_samples.
+        Returns a new float32 array; zero-baseline columns are left unchanged.
+        labels name the columns in warnings.
+        """
+        values = np.asarray(stack, dtype=np.float32)
+        dff = np.empty(values.shape, dtype=np.float32, order='F')
+        f0 = dff_kernel(values, t0_samples, t1_samples, dff)
+        
+        for j in np.flatnonzero(f0 == 0):
+            logger.warning("Zero baseline for %s, skipping normalization", labels[j] if labels else f"column {j}")
+        
+        return dff
+    
+    def normalize_stack_baseline(self, stack, baseline_start, baseline_duration, sampling_freq, labels=None):
+        """Apply ΔF/F₀ normalization to a (samples, traces) stack using specified baseline period."""
+        start_idx, end_idx = self._baseline_range(len(stack), baseline_start, baseline_duration, sampling_freq)
+        return self.compute_dff(stack, start_idx, end_idx, labels)
@@ -29,8 +29,19 @@ Debug version of the Multi-Trace Visualizer with extra logging for troubleshooti
 
 import sys
 import logging
+import threading
+import pandas as pd
 from PyQt5.QtWidgets import QApplication
 from multi_trace_visualizer import MultiTraceVisualizer
+from _kernels import warm_up
+
+# Copy-on-write lets loaded files share one DataFrame between the working and
+# original copies (always enabled from pandas 3.0, where the option is deprecated)
+if int(pd.__version__.split('.')[0]) < 3:
+    try:
+        pd.set_option("mode.copy_on_write", True)
+    except KeyError:
+        pass  # pandas < 1.5 has no copy-on-write mode
 
 # Set up logging
 logging.basicConfig(
@@ -47,6 +58,10 @@ logger = logging.getLogger("MultiTraceVis")
 if __name__ == "__main__":
     logger.info("Starting Multi-Trace Visualizer...")
     
+    # Compile the normalization kernels in the background so the first
+    # ΔF/F₀ update does not wait for JIT compilation
+    threading.Thread(target=warm_up, daemon=True).start()
+    
     # Create application
     app = QApplication(sys.argv)
     
@@ -1,17 +1,62 @@
+import logging
 import sys
 import os
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, 
     QPushButton, QFileDialog, QLabel, QComboBox, QCheckBox,
-    QDoubleSpinBox, QListWidget, QAbstractItemView, QGroupBox, 
+    QDoubleSpinBox, QListWidget, QListView, QAbstractItemView, QGroupBox, 
     QSplitter, QMessageBox, QRadioButton, QButtonGroup, QGridLayout
 )
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import (
+    Qt, QObject, QThread, QTimer, pyqtSignal,
+    QItemSelection, QItemSelectionModel, QStringListModel
+)
+from PyQt5.QtGui import QStandardItem, QStandardItemModel
 
 # Import our custom modules
 from data_manager import DataManager
 from plot_canvas import PlotCanvas
 
+logger = logging.getLogger(__name__)
+
+# Normalize method mapping (lowercased combo text -> plot canvas method)
+_NORM_MAPPING = {
+    'none': 'none',
+    'mean': 'mean',
+    'δf/f₀ (baseline)': 'baseline'
+}
+
+
+class FileLoaderWorker(QObject):
+    """Reads data files on a background QThread, reporting each file as it is read."""
+    
+    fileLoaded = pyqtSignal(str, object)  # file_path, file_data
+    fileFailed = pyqtSignal(str, str)     # file_path, error message
+    finished = pyqtSignal()
+    
+    def __init__(self, data_manager, file_paths, sampling_freq):
+        super().__init__()
+        self.data_manager = data_manager
+        self.file_paths = file_paths
+        self.sampling_freq = sampling_freq
+        self._cancelled = False
+    
+    def cancel(self):
+        """Stop after the file currently being reported."""
+        self._cancelled = True
+    
+    def run(self):
+        """Read all files; they are registered on the GUI thread by the connected slots."""
+        for file_path, file_data, error in self.data_manager.read_files(self.file_paths, self.sampling_freq):
+            if self._cancelled:
+                break
+            if error:
+                self.fileFailed.emit(file_path, error)
+            else:
+                self.fileLoaded.emit(file_path, file_data)
+        
+        self.finished.emit()
+
 class MultiTraceVisualizer(QMainWindow):
     """Main window for the multi-trace visualizer application."""
     
@@ -45,6 +90,12 @@ class MultiTraceVisualizer(QMainWindow):
         self.splitter.addWidget(self.right_panel)
         self.splitter.setSizes([400, 800])  # Initial sizes
         
+        # Coalesce bursts of control changes into a single replot
+        self._replot_timer = QTimer(self)
+        self._replot_timer.setSingleShot(True)
+        self._replot_timer.setInterval(40)
+        self._replot_timer.timeout.connect(self._do_update_visualization)
+        
         # Set up controls
         self._setup_controls()
         
@@ -54,6 +105,24 @@ class MultiTraceVisualizer(QMainWindow):
         
         # Store segment selection state
         self.selected_segments = {}  # {segment_name: {'left': bool, 'right': bool}}
+        
+        # Background file loading thread and worker currently running (if any)
+        self._load_thread = None
+        self._load_worker = None
+        self._load_errors = []
+        
+        # Segment lookups for the current file selection, reused until it changes
+        self._selected_files_key = None
+        self._segment_names_cache = None
+        
+        # Segment names currently shown in segment_list
+        self._current_segment_set = set()
+        
+        # Selections and settings of the last plot update
+        self._last_state = None
+        
+        # Set while on_samples_selected replaces the file selection
+        self._selecting_files = False
     
     def _setup_controls(self):
         """Set up control widgets in the left panel."""
@@ -74,14 +143,19 @@ class MultiTraceVisualizer(QMainWindow):
         self.freq_input.setDecimals(1)
         self.freq_input.setValue(5.0)  # Default 5 Hz
         self.freq_input.setSuffix(" Hz")
+        # Typed values apply on Enter or focus loss, not per keystroke
+        self.freq_input.setKeyboardTracking(False)
         self.freq_input.valueChanged.connect(self.on_sampling_freq_changed)
         freq_layout.addWidget(self.freq_input)
         file_layout.addLayout(freq_layout)
         
-        # File list
-        self.file_list = QListWidget()
+        # File list; each row keeps its file path in Qt.UserRole
+        self.file_model = QStandardItemModel(self)
+        self.file_list = QListView()
+        self.file_list.setModel(self.file_model)
+        self.file_list.setEditTriggers(QAbstractItemView.NoEditTriggers)
         self.file_list.setSelectionMode(QAbstractItemView.ExtendedSelection)
-        self.file_list.itemSelectionChanged.connect(self.update_segment_list)
+        self.file_list.selectionModel().selectionChanged.connect(lambda *_: self.on_files_selected())
         file_layout.addWidget(QLabel("Loaded Files:"))
         file_layout.addWidget(self.file_list)
         
@@ -94,9 +168,12 @@ class MultiTraceVisualizer(QMainWindow):
         
         # Replace sample dropdown with a sample list widget for multiple selection
         sample_layout.addWidget(QLabel("Select Samples:"))
-        self.sample_list = QListWidget()
+        self.sample_model = QStringListModel(self)
+        self.sample_list = QListView()
+        self.sample_list.setModel(self.sample_model)
+        self.sample_list.setEditTriggers(QAbstractItemView.NoEditTriggers)
         self.sample_list.setSelectionMode(QAbstractItemView.ExtendedSelection)
-        self.sample_list.itemSelectionChanged.connect(self.on_samples_selected)
+        self.sample_list.selectionModel().selectionChanged.connect(lambda *_: self.on_samples_selected())
         sample_layout.addWidget(self.sample_list)
         
         # Auto-select files checkbox
@@ -123,23 +200,25 @@ class MultiTraceVisualizer(QMainWindow):
         side_layout = QHBoxLayout()
         side_layout.addWidget(QLabel("Show:"))
         
-        # Create checkbox group for better UI
-        self.side_both_cb = QCheckBox("Both Sides")
-        self.side_left_cb = QCheckBox("Left Side")
-        self.side_right_cb = QCheckBox("Right Side")
+        # Exclusive radio buttons, so only one side option is active at a time
+        self.side_both_rb = QRadioButton("Both Sides")
+        self.side_left_rb = QRadioButton("Left Side")
+        self.side_right_rb = QRadioButton("Right Side")
         
-        self.side_both_cb.setChecked(True)
-        self.side_left_cb.setChecked(False)
-        self.side_right_cb.setChecked(False)
+        self.side_both_rb.setChecked(True)
         
-        # Connect side selection signals
-        self.side_both_cb.stateChanged.connect(self.on_side_selection_changed)
-        self.side_left_cb.stateChanged.connect(self.on_side_selection_changed)
-        self.side_right_cb.stateChanged.connect(self.on_side_selection_changed)
+        self.side_group = QButtonGroup(self)
+        self.side_group.setExclusive(True)
+        self.side_group.addButton(self.side_both_rb)
+        self.side_group.addButton(self.side_left_rb)
+        self.side_group.addButton(self.side_right_rb)
         
-        side_layout.addWidget(self.side_both_cb)
-        side_layout.addWidget(self.side_left_cb)
-        side_layout.addWidget(self.side_right_cb)
+        # Connect side selection signal
+        self.side_group.buttonClicked.connect(self.update_visualization)
+        
+        side_layout.addWidget(self.side_both_rb)
+        side_layout.addWidget(self.side_left_rb)
+        side_layout.addWidget(self.side_right_rb)
         
         segment_layout.addLayout(side_layout)
         
@@ -189,6 +268,8 @@ class MultiTraceVisualizer(QMainWindow):
         self.baseline_start.setRange(0, 1000)
         self.baseline_start.setValue(0)
         self.baseline_start.setSuffix(" s")
+        # Typed values apply on Enter or focus loss; arrow steps go through the replot timer
+        self.baseline_start.setKeyboardTracking(False)
         self.baseline_start.valueChanged.connect(self.update_visualization)
         baseline_layout.addWidget(QLabel("Start:"))
         baseline_layout.addWidget(self.baseline_start)
@@ -197,6 +278,7 @@ class MultiTraceVisualizer(QMainWindow):
         self.baseline_duration.setRange(0.1, 1000)
         self.baseline_duration.setValue(10)
         self.baseline_duration.setSuffix(" s")
+        self.baseline_duration.setKeyboardTracking(False)
         self.baseline_duration.valueChanged.connect(self.update_visualization)
         baseline_layout.addWidget(QLabel("Duration:"))
         baseline_layout.addWidget(self.baseline_duration)
@@ -248,82 +330,167 @@ class MultiTraceVisualizer(QMainWindow):
         )
         
         if file_paths:
-            try:
-                # Get current sampling frequency
-                sampling_freq = self.freq_input.value()
-                
-                # Load each file
-                for file_path in file_paths:
-                    self.data_manager.load_file(file_path, sampling_freq)
-                
-                # Update file list
-                self.update_file_list()
-                
-                # Update sample list
-                self.update_sample_list()
-                
-                # Try to auto-select files if samples are selected
-                if self.auto_select_cb.isChecked() and self.sample_list.count() > 0:
-                    self.on_samples_selected()
-                
-            except Exception as e:
-                QMessageBox.warning(self, "Error", f"Could not load files: {str(e)}")
-                
-                # Print detailed error for debugging
-                import traceback
-                traceback.print_exc()
+            # Read the files in the background; each one is added as it arrives
+            self.load_btn.setEnabled(False)
+            self._load_errors = []
+            
+            thread = QThread(self)
+            worker = FileLoaderWorker(self.data_manager, file_paths, self.freq_input.value())
+            worker.moveToThread(thread)
+            
+            # Cross-thread connections are queued, so the slots run on the GUI thread
+            thread.started.connect(worker.run)
+            worker.fileLoaded.connect(self.on_file_loaded)
+            worker.fileFailed.connect(self.on_file_failed)
+            worker.finished.connect(self.on_files_loaded)
+            worker.finished.connect(thread.quit)
+            thread.finished.connect(worker.deleteLater)
+            thread.finished.connect(thread.deleteLater)
+            
+            self._load_thread = thread
+            self._load_worker = worker
+            thread.start()
+    
+    def on_file_loaded(self, file_path, file_data):
+        """Register a file read in the background and show it in the lists."""
+        try:
+            is_new = file_path not in self.data_manager.loaded_files
+            self.data_manager.add_file(file_path, file_data)
+            
+            # Reloaded files may have new segments and data
+            self._invalidate_segment_caches()
+            self._last_state = None
+            
+            # Add to file list; a reloaded file keeps its row
+            if is_new:
+                item = QStandardItem(self.data_manager.get_file_display_name(file_path))
+                item.setData(file_path, Qt.UserRole)
+                item.setEditable(False)
+                self.file_model.appendRow(item)
+            
+            # Update sample list
+            self.update_sample_list()
+            
+        except Exception as e:
+            QMessageBox.warning(self, "Error", f"Could not load files: {str(e)}")
+            
+            # Print detailed error for debugging
+            import traceback
+            traceback.print_exc()
+    
+    def on_file_failed(self, file_path, error):
+        """Collect a load error; they are reported together when loading ends."""
+        self._load_errors.append(error)
+    
+    def on_files_loaded(self):
+        """Finish a background load: re-enable loading and apply auto-selection."""
+        self._load_thread = None
+        self._load_worker = None
+        self.load_btn.setEnabled(True)
+        
+        # Try to auto-select files if samples are selected
+        if self.auto_select_cb.isChecked() and self.sample_model.rowCount() > 0:
+            self.on_samples_selected()
+        
+        if self._load_errors:
+            QMessageBox.warning(self, "Error", "Could not load files:\n" + "\n".join(self._load_errors))
     
-    def update_file_list(self):
-        """Update the file list widget with loaded files."""
-        self.file_list.clear()
-        
-        for file_path in self.data_manager.loaded_files:
-            display_name = self.data_manager.get_file_display_name(file_path)
-            item = self.file_list.addItem(display_name)
-            self.file_list.item(self.file_list.count()-1).setData(Qt.UserRole, file_path)
+    def closeEvent(self, event):
+        """Stop a background load before the window closes."""
+        if self._load_worker is not None:
+            self._load_worker.cancel()
+            self._load_thread.quit()
+            self._load_thread.wait()
+        super().closeEvent(event)
+    
+    def _invalidate_segment_caches(self):
+        """Drop the cached segment lookups."""
+        self._selected_files_key = None
+        self._segment_names_cache = None
+    
+    def _use_selected_files(self, selected_files):
+        """Drop the cached segment lookups if the file selection has changed."""
+        key = frozenset(selected_files)
+        if key != self._selected_files_key:
+            self._invalidate_segment_caches()
+            self._selected_files_key = key
     
     def update_sample_list(self):
-        """Update the sample selection list."""
-        self.sample_list.clear()
+        """Update the sample selection list, keeping the selected samples selected."""
         samples = self.data_manager.get_samples()
+        current = self.sample_model.stringList()
+        if samples == current:
+            return
         
-        if samples:
-            # Add each sample to the list
-            for sample in samples:
-                self.sample_list.addItem(sample)
+        # Usually files only add samples: insert the new names in place, which
+        # leaves the existing rows and their selection untouched
+        remaining = iter(samples)
+        if all(name in remaining for name in current):
+            for row, name in enumerate(samples):
+                if row >= len(current) or current[row] != name:
+                    self.sample_model.insertRows(row, 1)
+                    self.sample_model.setData(self.sample_model.index(row, 0), name)
+                    current.insert(row, name)
+            return
+        
+        # Otherwise replace all rows in one model reset and select the kept names again
+        selected = set(self._selected_rows(self.sample_list))
+        self.sample_model.setStringList(samples)
+        selection = QItemSelection()
+        for row, name in enumerate(samples):
+            if name in selected:
+                index = self.sample_model.index(row, 0)
+                selection.select(index, index)
+        if not selection.isEmpty():
+            self.sample_list.selectionModel().select(selection, QItemSelectionModel.Select)
+    
+    def _selected_rows(self, view, role=Qt.DisplayRole):
+        """Get the given role's data of the selected rows of a list view as a tuple, in row order."""
+        indexes = sorted(view.selectionModel().selectedIndexes(), key=lambda index: index.row())
+        return tuple(index.data(role) for index in indexes)
     
     def update_segment_list(self):
         """Update the segment list with available segments from selected files."""
         # Get selected files
-        selected_files = []
-        for item in self.file_list.selectedItems():
-            file_path = item.data(Qt.UserRole)
-            selected_files.append(file_path)
+        selected_files = self._selected_rows(self.file_list, Qt.UserRole)
         
         if not selected_files:
             self.segment_list.clear()
+            self._current_segment_set = set()
             return
         
         # Get segments from selected files
-        segments = self.data_manager.get_segment_names(selected_files)
-        
-        # Store current selections
-        current_selections = []
-        for i in range(self.segment_list.count()):
-            item = self.segment_list.item(i)
-            if item.isSelected():
-                current_selections.append(item.text())
-        
-        # Update segment list
-        self.segment_list.clear()
-        if segments:
-            self.segment_list.addItems(segments)
-            
-            # Restore previous selections if possible
-            for i in range(self.segment_list.count()):
-                item = self.segment_list.item(i)
-                if item.text() in current_selections:
-                    item.setSelected(True)
+        self._use_selected_files(selected_files)
+        if self._segment_names_cache is None:
+            self._segment_names_cache = self.data_manager.get_segment_names(selected_files)
+        segments = self._segment_names_cache
+        
+        # Only add and remove the names that changed; items that stay keep
+        # their row and selection state
+        new_set = set(segments)
+        to_remove = self._current_segment_set - new_set
+        to_add = new_set - self._current_segment_set
+        
+        # Update segment list without a selection signal per item; the
+        # explicit on_segments_selected() call below handles the change once
+        self.segment_list.blockSignals(True)
+        self.segment_list.setUpdatesEnabled(False)
+        
+        if to_remove:
+            rows = {self.segment_list.item(i).text(): i for i in range(self.segment_list.count())}
+            for row in sorted((rows[name] for name in to_remove), reverse=True):
+                self.segment_list.takeItem(row)
+        
+        # Both lists are naturally sorted, so the kept items are already in
+        # order and each new name goes in at its final row
+        if to_add:
+            for row, name in enumerate(segments):
+                if name in to_add:
+                    self.segment_list.insertItem(row, name)
+        
+        self.segment_list.setUpdatesEnabled(True)
+        self.segment_list.blockSignals(False)
+        self._current_segment_set = new_set
         
         # Update visualization
         self.on_segments_selected()
@@ -334,47 +501,43 @@ class MultiTraceVisualizer(QMainWindow):
             return
         
         # Get all selected samples
-        selected_samples = []
-        for item in self.sample_list.selectedItems():
-            selected_samples.append(item.text())
+        selected_samples = self._selected_rows(self.sample_list)
         
         if not selected_samples:
             return
         
         # Get all files for selected samples
-        selected_files = []
+        selected_files = set()
         for sample in selected_samples:
-            sample_files = self.data_manager.get_files_by_sample(sample)
-            selected_files.extend(sample_files)
+            selected_files.update(self.data_manager.get_files_by_sample(sample))
         
-        # Clear current file selection
-        self.file_list.clearSelection()
-        
-        # Select all files for all selected samples
-        for i in range(self.file_list.count()):
-            item = self.file_list.item(i)
-            file_path = item.data(Qt.UserRole)
+        # Select all files for all selected samples, replacing the current
+        # file selection in one step
+        selection = QItemSelection()
+        for row in range(self.file_model.rowCount()):
+            index = self.file_model.index(row, 0)
             
-            if file_path in selected_files:
-                item.setSelected(True)
+            if index.data(Qt.UserRole) in selected_files:
+                selection.select(index, index)
+        
+        # Refresh once even if the selection is unchanged (files may have been
+        # reloaded). The selection model still signals, so the view repaints.
+        self._selecting_files = True
+        try:
+            self.file_list.selectionModel().select(selection, QItemSelectionModel.ClearAndSelect)
+        finally:
+            self._selecting_files = False
+        self.update_segment_list()
+    
+    def on_files_selected(self):
+        """Handle file selection changes."""
+        if not self._selecting_files:
+            self.update_segment_list()
     
     def on_segments_selected(self):
         """Handle segment selection changes."""
         self.update_visualization()
     
-    def on_side_selection_changed(self):
-        """Handle changes to side selection checkboxes."""
-        # If "Both Sides" is checked, uncheck individual sides
-        if self.side_both_cb.isChecked():
-            self.side_left_cb.setChecked(False)
-            self.side_right_cb.setChecked(False)
-        
-        # If neither is checked, default to "Both Sides"
-        if not self.side_both_cb.isChecked() and not self.side_left_cb.isChecked() and not self.side_right_cb.isChecked():
-            self.side_both_cb.setChecked(True)
-        
-        self.update_visualization()
-    
     def on_auto_select_changed(self, state):
         """Handle changes to the auto-select checkbox."""
         if state == Qt.Checked:
@@ -412,136 +575,140 @@ class MultiTraceVisualizer(QMainWindow):
     
     def get_selected_segments_and_sides(self):
         """Get the currently selected segments and sides."""
-        selected_segments = []
-        for item in self.segment_list.selectedItems():
-            selected_segments.append(item.text())
+        # Read the selection model directly, in selection order (the first two
+        # selected segments are the delta pair)
+        selected_segments = tuple(index.data() for index in self.segment_list.selectionModel().selectedIndexes())
         
         # Determine which sides to show
-        show_left = self.side_left_cb.isChecked() or self.side_both_cb.isChecked()
-        show_right = self.side_right_cb.isChecked() or self.side_both_cb.isChecked()
+        show_both = self.side_both_rb.isChecked()
+        show_left = show_both or self.side_left_rb.isChecked()
+        show_right = show_both or self.side_right_rb.isChecked()
         
-        print(f"Selected segments: {selected_segments}")
-        print(f"Show left: {show_left}, Show right: {show_right}")
+        logger.debug("Selected segments: %s", selected_segments)
+        logger.debug("Show left: %s, Show right: %s", show_left, show_right)
         
         return selected_segments, show_left, show_right
     
-    def get_plot_data_for_segments(self, selected_segments, show_left, show_right):
-        """Prepare plot data for the selected segments and sides."""
-        # Get selected files
-        selected_files = []
-        for item in self.file_list.selectedItems():
-            file_path = item.data(Qt.UserRole)
-            selected_files.append(file_path)
-        
+    def get_plot_data_for_segments(self, selected_files, selected_segments, show_left, show_right):
+        """Prepare plot data for the selected files, segments and sides."""
         if not selected_files:
-            print("No files selected")
+            logger.debug("No files selected")
             return {}
         
-        # Get all segments data
-        all_segments = self.data_manager.get_all_segments(selected_files)
-        
         # Prepare plot data
         plot_data = {}
+        loaded_files = self.data_manager.loaded_files
+        
+        sides = []
+        if show_left:
+            sides.append('l')
+        if show_right:
+            sides.append('r')
+        
+        # Look the selected segments up in each file's (segment, side) index;
+        # files without a selected segment add nothing
+        collected = {}  # {(segment_name, side): [traces]} in file order
+        for file_path in selected_files:
+            file_entry = loaded_files.get(file_path)
+            if file_entry is None:
+                continue
+            
+            index = file_entry['index']
+            t = None  # One shared time array per file
+            
+            for segment_name in selected_segments:
+                for side in sides:
+                    columns = index.get((segment_name, side))
+                    if not columns:
+                        continue
+                    
+                    if t is None:
+                        t = self.data_manager.get_time_values(file_path)
+                    
+                    collected.setdefault((segment_name, side), []).extend(
+                        {
+                            'file_path': file_path,
+                            'column': column,
+                            'y': file_entry['arrays'][column],
+                            't': t,
+                            'region': file_entry['region'],
+                            'side': side
+                        }
+                        for column in columns
+                    )
         
         for segment_name in selected_segments:
-            if segment_name in all_segments:
-                segment_data = all_segments[segment_name]
-                traces = []
-                
-                # Add left side traces if selected
-                if show_left and 'left' in segment_data:
-                    for trace_info in segment_data['left']:
-                        file_path = trace_info['file_path']
-                        column = trace_info['column']
-                        
-                        if file_path in self.data_manager.loaded_files:
-                            df = self.data_manager.loaded_files[file_path]['df']
-                            region = self.data_manager.loaded_files[file_path]['info'].get('region', '')
-                            
-                            # Make sure column exists in df
-                            if column in df.columns:
-                                traces.append({
-                                    'file_path': file_path,
-                                    'column': column,
-                                    'df': df,
-                                    'region': region
-                                })
-                
-                # Add right side traces if selected
-                if show_right and 'right' in segment_data:
-                    for trace_info in segment_data['right']:
-                        file_path = trace_info['file_path']
-                        column = trace_info['column']
-                        
-                        if file_path in self.data_manager.loaded_files:
-                            df = self.data_manager.loaded_files[file_path]['df']
-                            region = self.data_manager.loaded_files[file_path]['info'].get('region', '')
-                            
-                            # Make sure column exists in df
-                            if column in df.columns:
-                                traces.append({
-                                    'file_path': file_path,
-                                    'column': column,
-                                    'df': df,
-                                    'region': region
-                                })
-                
-                if traces:  # Only add segment if it has traces to plot
-                    plot_data[segment_name] = {
-                        'traces': traces
-                    }
-                    print(f"Added {len(traces)} traces for segment {segment_name}")
+            # Left side traces first, then right, as selected
+            traces = [trace for side in sides for trace in collected.get((segment_name, side), ())]
+            
+            if traces:  # Only add segment if it has traces to plot
+                plot_data[segment_name] = {
+                    'traces': traces
+                }
+                logger.debug("Added %d traces for segment %s", len(traces), segment_name)
         
         return plot_data
     
     def update_visualization(self):
+        """Schedule a plot update; rapid successive calls result in one replot."""
+        self._replot_timer.start()
+    
+    def _do_update_visualization(self):
         """Update the plot based on current selections and settings."""
-        # Get selected segments and sides
+        # Get selected files, segments and sides (read once per update)
+        selected_files = self._selected_rows(self.file_list, Qt.UserRole)
         selected_segments, show_left, show_right = self.get_selected_segments_and_sides()
         
+        # Get current settings
+        data_manager = self.data_manager
+        plot_canvas = self.plot_canvas
+        norm_method = self.norm_combo.currentText().lower()
+        view_mode = self.view_combo.currentText().lower()
+        baseline_start = self.baseline_start.value()
+        baseline_duration = self.baseline_duration.value()
+        show_mean = self.show_mean_cb.isChecked()
+        show_delta = self.show_delta_cb.isChecked()
+        sampling_freq = data_manager.sampling_freq
+        
+        # Skip the replot if nothing that affects the plot has changed
+        state = (
+            frozenset(selected_files),
+            selected_segments, show_left, show_right,
+            norm_method, view_mode, baseline_start, baseline_duration,
+            show_mean, show_delta, sampling_freq
+        )
+        if state == self._last_state:
+            return
+        self._last_state = state
+        
         if not selected_segments:
             # Clear plot if no segments selected
-            if hasattr(self.plot_canvas, 'update_plot'):
-                self.plot_canvas.update_plot({})
+            if hasattr(plot_canvas, 'update_plot'):
+                plot_canvas.update_plot({})
             return
         
         # Get plot data
-        plot_data = self.get_plot_data_for_segments(selected_segments, show_left, show_right)
+        plot_data = self.get_plot_data_for_segments(selected_files, selected_segments, show_left, show_right)
         
         if not plot_data:
-            print("No plot data available")
+            logger.debug("No plot data available")
             # Clear plot if no data
-            if hasattr(self.plot_canvas, 'update_plot'):
-                self.plot_canvas.update_plot({})
+            if hasattr(plot_canvas, 'update_plot'):
+                plot_canvas.update_plot({})
             return
         
-        # Get current settings
-        norm_method = self.norm_combo.currentText().lower()
-        view_mode = self.view_combo.currentText().lower()
-        baseline_start = self.baseline_start.value()
-        baseline_duration = self.baseline_duration.value()
-        show_mean = self.show_mean_cb.isChecked()
-        show_delta = self.show_delta_cb.isChecked()
-        
-        # Normalize method mapping
-        norm_mapping = {
-            'none': 'none',
-            'mean': 'mean',
-            'δf/f₀ (baseline)': 'baseline'
-        }
-        
         # Update plot
-        if hasattr(self.plot_canvas, 'update_plot'):
-            self.plot_canvas.update_plot(
+        if hasattr(plot_canvas, 'update_plot'):
+            plot_canvas.update_plot(
                 plot_data,
-                norm_mapping.get(norm_method, 'none'),
+                _NORM_MAPPING.get(norm_method, 'none'),
                 view_mode,
                 baseline_start,
                 baseline_duration,
-                self.data_manager.sampling_freq,
+                sampling_freq,
                 show_mean=show_mean,
                 show_delta=show_delta,
-                delta_segments=selected_segments[:2] if show_delta and len(selected_segments) >= 2 else None
+                delta_segments=list(selected_segments[:2]) if show_delta and len(selected_segments) >= 2 else None
             )
     
     def export_figure(self):
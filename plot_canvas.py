@@ -1,15 +1,51 @@
 import os
+import functools
 import numpy as np
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 from matplotlib.backends.backend_qt5agg import NavigationToolbar2QT as NavigationToolbar
+from matplotlib.collections import LineCollection
 from PyQt5.QtWidgets import QWidget, QVBoxLayout
+from PyQt5.QtCore import QTimer
 import re
 from scipy.ndimage import gaussian_filter1d
+from _kernels import m4_indices
+
+@functools.lru_cache(maxsize=1024)
+def _sample_name(file_path):
+    """Short sample name for legend labels: the first three '_' fields of the file name."""
+    return '_'.join(os.path.basename(file_path).split('_')[0:3])
+
+
+def _m4_downsample(x, y, x_lo, x_hi, n_pixels):
+    """
+    Reduce a trace sorted by x to the samples that shape it on screen (M4): the
+    first, last, minimum and maximum sample of each of n_pixels bins over
+    [x_lo, x_hi]. One sample beyond each end is kept so the line runs to the border.
+    """
+    start = max(int(np.searchsorted(x, x_lo, 'left')) - 1, 0)
+    stop = min(int(np.searchsorted(x, x_hi, 'right')) + 1, len(x))
+    if stop - start <= 4 * n_pixels or x_hi <= x_lo:
+        return x[start:stop], y[start:stop]
+    
+    idx = m4_indices(x[start:stop], y[start:stop], x_lo, x_hi, n_pixels) + start
+    return x[idx], y[idx]
+
 
 class PlotCanvas(QWidget):
     """Widget for plotting time series data."""
     
+    # Side of a trace column, e.g. Mean(a1l) -> 'l'
+    _SIDE_RE = re.compile(r'Mean\((.*?)([lr])\)')
+    
+    # Order of regions within a stacked segment
+    _REGION_ORDER = ('soma', 'axon', 'axons', 'dend', 'dendrite', 'dendrites', 'mix', 'unknown')
+    
+    # Above this many traces lines are rasterized in vector output
+    RASTERIZE_THRESHOLD = 50
+    # Above this many traces the overlay view shows a count instead of a legend
+    LEGEND_MAX_ENTRIES = 40
+    
     def __init__(self, parent=None):
         super().__init__(parent)
         self.parent = parent
@@ -31,12 +67,47 @@ class PlotCanvas(QWidget):
         self.canvas.draw()
         
         # Store current plot state
-        self.current_dfs = {}  # {file_path: df}
+        self.current_dfs = {}  # Plot data last passed to update_plot
         self.current_view = 'overlay'  # 'overlay' or 'stacked'
         self.current_normalization = 'none'  # 'none', 'mean', or 'baseline'
         self.baseline_start = 0
         self.baseline_duration = 10
         
+        # Flat float32 buffer reused for trace stacks, grown as needed
+        self._stack_buf = None
+        
+        # Normalized values of the last plotted traces, see _process_traces
+        self._processed_settings = None
+        self._processed_cache = {}
+        
+        # Coalesce rapid filter requests into one replot
+        self._pending_sigma = 0
+        self._replot_timer = QTimer(self)
+        self._replot_timer.setSingleShot(True)
+        self._replot_timer.timeout.connect(self._do_replot)
+        
+        # Resolved (left color, right color, line style) per region name
+        self._region_resolve_cache = {}
+        self._region_priority_cache = {}  # {region name: stacking position}
+        
+        # Lines of the current figure, reused while its layout is unchanged
+        self._line_cache = {}  # {(segment, file_path, column): (artist, trace index, y offset)}
+        self._plot_axes = []
+        self._axes_signature = None
+        self._last_spec = None  # Everything the current figure was drawn from
+        
+        # Full-resolution values of each line (Line2D) or set of lines
+        # (LineCollection); they draw an M4 reduction of them for the visible
+        # x range, redone on zoom, pan and resize
+        self._line_values = {}  # {artist: [(x, y, y offset) per trace]}
+        self.canvas.mpl_connect('resize_event', lambda event: self._downsample_lines())
+        
+        # Axes backgrounds without lines, for blitting filter updates
+        self._blit_backgrounds = None  # {Axes: saved region}
+        self._blit_overlays = {}  # {Axes: artists drawn over the lines}
+        self._capturing = False
+        self.canvas.mpl_connect('draw_event', self._on_draw)
+        
         # Define color schemes for left and right sides
         self.left_colors = {
             'soma': 'red',            # pure red for soma
@@ -74,7 +145,7 @@ class PlotCanvas(QWidget):
     
     def update_plot(self, plot_data, normalization='none', view_mode='overlay', 
                    baseline_start=0, baseline_duration=10, sampling_freq=5.0,
-                   show_mean=False, show_delta=False, delta_segments=None):
+                   show_mean=False, show_delta=False, delta_segments=None, keep_limits=False):
         """
         Update the plot with the given data.
         
@@ -88,6 +159,8 @@ class PlotCanvas(QWidget):
             show_mean: Whether to show mean traces for each segment
             show_delta: Whether to show delta between segments
             delta_segments: List of segments to calculate delta for
+            keep_limits: Keep the axis limits while the new data fits in them,
+                so only the lines are redrawn (used for filter updates)
         """
         try:
             # Debug info
@@ -95,15 +168,20 @@ class PlotCanvas(QWidget):
             for segment, data in plot_data.items():
                 print(f"  Segment {segment}: {len(data['traces'])} traces")
                 
-            # Clear existing figure to start fresh
-            self.figure.clear()
-            
             if not plot_data:
+                self._clear_line_cache()
+                self.figure.clear()
                 self.ax = self.figure.add_subplot(111)
                 self.ax.set_title('No data selected')
                 self.canvas.draw()
                 return
             
+            # Nothing changed since the last plot: keep the figure as it is
+            spec = self._plot_spec(plot_data, normalization, view_mode,
+                                   baseline_start, baseline_duration, sampling_freq)
+            if spec == self._last_spec and not show_mean and not show_delta:
+                return
+            
             # Update current state
             self.current_dfs = plot_data
             self.current_view = view_mode
@@ -111,9 +189,28 @@ class PlotCanvas(QWidget):
             self.baseline_start = baseline_start
             self.baseline_duration = baseline_duration
             
+            # Normalize all traces up front, batched by length
+            processed = self._process_traces(plot_data, normalization, baseline_start, baseline_duration, sampling_freq)
+            
+            # Same axes and traces as the current figure: only replace the line data
+            signature = self._plot_signature(plot_data, normalization, view_mode)
+            if signature == self._axes_signature:
+                self._update_line_data(plot_data, processed, sampling_freq, keep_limits)
+                self._last_spec = spec
+                return
+            
+            # Clear existing figure to start fresh
+            self._clear_line_cache()
+            self.figure.clear()
+            
             # Track max time for x-axis
             max_time = 0
             min_time = float('inf')
+            time_bounds = {}  # Traces of one file share a time array
+            
+            # Many lines are drawn as one image in vector output (PDF export)
+            n_traces = len(processed)
+            rasterized = n_traces > self.RASTERIZE_THRESHOLD
             
             if view_mode.lower() == 'overlay':
                 # Create a single subplot for overlay view
@@ -126,75 +223,52 @@ class PlotCanvas(QWidget):
                         file_path = trace.get('file_path')
                         column = trace.get('column')
                         region = trace.get('region', '')
-                        df = trace.get('df')
                         
                         # Skip if no data
-                        if df is None or column not in df.columns:
-                            print(f"Skipping trace: file_path={file_path}, column={column} - not in DataFrame")
+                        if trace.get('y') is None:
+                            print(f"Skipping trace: file_path={file_path}, column={column} - no data")
                             continue
                         
                         # Process data
-                        processed_df = self._process_dataframe(df, normalization, baseline_start, baseline_duration, sampling_freq)
+                        y = processed[id(trace)]
                         
                         # Get time values
-                        x = self._get_time_values(processed_df, sampling_freq)
+                        x = self._get_time_values(trace, sampling_freq)
                         if len(x) > 0:
-                            if max(x) > max_time:
-                                max_time = max(x)
-                            if min(x) < min_time:
-                                min_time = min(x)
+                            x_min, x_max = self._time_bounds(x, time_bounds)
+                            max_time = max(max_time, x_max)
+                            min_time = min(min_time, x_min)
                         
                         # Determine side (left or right)
-                        side = None
-                        match = re.search(r'Mean\((.*?)([lr])\)', column)
-                        if match:
-                            side = match.group(2)
+                        side = self._trace_side(trace)
+                        if side:
                             side_info = " (L)" if side == 'l' else " (R)"
                         else:
                             side_info = ""
                         
                         # Choose color based on side and region
-                        color = None
+                        left_color, right_color, linestyle = self._resolve_region(region)
                         if side == 'l':  # Left side - red colors
-                            # Find color for this region
-                            for reg_key, col_value in self.left_colors.items():
-                                if region and reg_key in region.lower():
-                                    color = col_value
-                                    break
-                            if color is None:
-                                color = self.left_colors['default']
+                            color = left_color
                         elif side == 'r':  # Right side - blue colors
-                            # Find color for this region
-                            for reg_key, col_value in self.right_colors.items():
-                                if region and reg_key in region.lower():
-                                    color = col_value
-                                    break
-                            if color is None:
-                                color = self.right_colors['default']
+                            color = right_color
                         else:  # No clear side - use green
                             color = 'green'
                         
-                        # Get line style based on region
-                        linestyle = None
-                        for reg_key, style in self.region_styles.items():
-                            if region and reg_key in region.lower():
-                                linestyle = style
-                                break
-                        if linestyle is None:
-                            linestyle = self.region_styles['default']
-                        
                         # Create a descriptive label
-                        sample_name = os.path.basename(file_path).split('_')[0:3]
-                        sample_name = '_'.join(sample_name)
+                        sample_name = _sample_name(file_path)
                         region_info = f" ({region})" if region else ""
                         label = f"{segment_name}{side_info}{region_info} - {sample_name}"
                         
                         # Plot with the determined style
-                        self.ax.plot(x, processed_df[column], 
+                        line, = self.ax.plot(x, y, 
                                     label=label, 
                                     color=color,
                                     linestyle=linestyle,
-                                    linewidth=1.5)
+                                    linewidth=1.5,
+                                    rasterized=rasterized)
+                        self._line_cache[(segment_name, file_path, column)] = (line, 0, 0)
+                        self._line_values[line] = [(x, y, 0)]
                 
                 # Configure axis for overlay mode
                 if normalization == 'mean':
@@ -204,8 +278,13 @@ class PlotCanvas(QWidget):
                 else:
                     self.ax.set_ylabel('Signal')
                 
-                # Add legend with smaller font
-                self.ax.legend(fontsize=8, loc='upper right')
+                # Add legend with smaller font; a legend of very many
+                # entries is slow to lay out and unreadable anyway
+                if n_traces <= self.LEGEND_MAX_ENTRIES:
+                    self.ax.legend(fontsize=8, loc='upper right')
+                else:
+                    self.ax.text(0.99, 0.99, f"{n_traces} traces", transform=self.ax.transAxes,
+                                 fontsize=8, ha='right', va='top')
                 
             else:  # stacked view
                 # Sort segments by type (t segments first, then a segments)
@@ -241,16 +320,14 @@ class PlotCanvas(QWidget):
                             region_traces[region] = {'left': [], 'right': []}
                         
                         # Determine side and add to appropriate list
-                        match = re.search(r'Mean\((.*?)([lr])\)', trace.get('column', ''))
-                        if match and match.group(2) == 'l':
+                        side = self._trace_side(trace)
+                        if side == 'l':
                             region_traces[region]['left'].append(trace)
-                        elif match and match.group(2) == 'r':
+                        elif side == 'r':
                             region_traces[region]['right'].append(trace)
                     
                     # Sort regions to ensure consistent order (soma, axon, dend, mix)
-                    region_order = ['soma', 'axon', 'axons', 'dend', 'dendrite', 'dendrites', 'mix', 'unknown']
-                    sorted_regions = sorted(region_traces.keys(), 
-                                          key=lambda r: next((i for i, reg in enumerate(region_order) if reg in r.lower()), len(region_order)))
+                    sorted_regions = sorted(region_traces.keys(), key=self._region_priority)
                     
                     # Vertical offset between regions within the same segment
                     region_offset = 20  # Base offset between regions
@@ -274,37 +351,44 @@ class PlotCanvas(QWidget):
                             (left_traces, 'l', self.left_colors),
                             (right_traces, 'r', self.right_colors)
                         ]:
+                            # Get color for the traces of this region and side
+                            color = color_map.get(region, color_map['default'])
+                            entries = []
+                            
                             for trace in traces:
                                 file_path = trace.get('file_path')
                                 column = trace.get('column')
-                                df = trace.get('df')
                                 
-                                if df is None or column not in df.columns:
-                                    print(f"Skipping trace in stacked view: file_path={file_path}, column={column} - not in DataFrame")
+                                if trace.get('y') is None:
+                                    print(f"Skipping trace in stacked view: file_path={file_path}, column={column} - no data")
                                     continue
                                 
                                 # Process data
-                                processed_df = self._process_dataframe(df, normalization, baseline_start, baseline_duration, sampling_freq)
+                                y = processed[id(trace)]
                                 
                                 # Get time values
-                                x = self._get_time_values(processed_df, sampling_freq)
+                                x = self._get_time_values(trace, sampling_freq)
                                 if len(x) > 0:
                                     has_time_values = True
-                                    if max(x) > max_time:
-                                        max_time = max(x)
-                                    if min(x) < min_time:
-                                        min_time = min(x)
+                                    x_min, x_max = self._time_bounds(x, time_bounds)
+                                    max_time = max(max_time, x_max)
+                                    min_time = min(min_time, x_min)
                                 else:
                                     continue
                                 
-                                # Get color for this trace
-                                color = color_map.get(region, color_map['default'])
-                                
-                                # Plot the trace with offset
-                                if column in processed_df.columns:
-                                    y_values = processed_df[column].values + total_offset
-                                    ax.plot(x, y_values, color=color, linewidth=1.0)
-                                    has_plotted_data = True
+                                entries.append(((segment_name, file_path, column), x, y))
+                            
+                            # Draw all traces of one color as a single artist, with offset
+                            # and the cap and join style of a plotted line
+                            if entries:
+                                collection = LineCollection([], colors=color, linewidths=1.0,
+                                                            capstyle='projecting', joinstyle='round',
+                                                            rasterized=rasterized)
+                                ax.add_collection(collection, autolim=False)
+                                self._line_values[collection] = [(x, y, total_offset) for _, x, y in entries]
+                                for j, (key, _, _) in enumerate(entries):
+                                    self._line_cache[key] = (collection, j, total_offset)
+                                has_plotted_data = True
                         
                         # Add region label if there are traces to display
                         if has_plotted_data and has_time_values:
@@ -347,6 +431,11 @@ class PlotCanvas(QWidget):
                 # Add x-axis label to bottom subplot
                 if axes:
                     axes[-1].set_xlabel('Time (s)')
+                
+                # Collections were added without data limits: scale y to them
+                for ax in axes:
+                    self._update_collection_limits(ax, time_bounds)
+                    ax.autoscale_view(scalex=False)
             
             # Configure x-axis (add some margin)
             if min_time < float('inf') and max_time > 0:
@@ -365,89 +454,421 @@ class PlotCanvas(QWidget):
             else:
                 plt.tight_layout()
             
+            # Later updates with the same signature reuse these lines
+            self._plot_axes = [self.ax] if view_mode.lower() == 'overlay' else axes
+            
+            # Draw reduced lines, and reduce again when the x range changes
+            self._downsample_lines()
+            for ax in self._plot_axes:
+                ax.callbacks.connect('xlim_changed', self._on_xlim_changed)
+            
             # Show plot
             self.canvas.draw()
             
+            self._axes_signature = signature
+            self._last_spec = spec
+            
         except Exception as e:
             import traceback
             print(f"Error in update_plot: {str(e)}")
             traceback.print_exc()
             
             # Create a fallback simple plot 
+            self._clear_line_cache()
             self.figure.clear()
             ax = self.figure.add_subplot(111)
             ax.set_title(f"Error plotting: {str(e)}")
             self.canvas.draw()
     
-    def _get_time_values(self, df, sampling_freq):
-        """Get time values from DataFrame or generate based on sampling frequency."""
+    def _plot_signature(self, plot_data, normalization, view_mode):
+        """
+        Get a key for the figure layout: the view, the axis labels and which
+        traces are plotted where. Updates with an equal key reuse the lines.
+        """
+        return (view_mode.lower(), normalization, tuple(
+            (segment_name, trace.get('region'), trace.get('file_path'), trace.get('column'))
+            for segment_name, segment_data in plot_data.items()
+            for trace in segment_data['traces'] if trace.get('y') is not None
+        ))
+    
+    def _plot_spec(self, plot_data, normalization, view_mode,
+                   baseline_start, baseline_duration, sampling_freq):
+        """
+        Get a key for everything a plot is drawn from. Traces are identified by
+        their data arrays too, so filtered data never compares equal to the original.
+        """
+        return (self._plot_signature(plot_data, normalization, view_mode),
+                baseline_start, baseline_duration, sampling_freq, tuple(
+                    (id(trace.get('y')), id(trace.get('t')))
+                    for segment_data in plot_data.values()
+                    for trace in segment_data['traces']
+                ))
+    
+    def _clear_line_cache(self):
+        """Forget the lines of the current figure before it is rebuilt."""
+        self._line_cache = {}
+        self._plot_axes = []
+        self._axes_signature = None
+        self._last_spec = None
+        self._line_values = {}
+        self._blit_backgrounds = None
+    
+    def _update_line_data(self, plot_data, processed, sampling_freq, keep_limits=False):
+        """
+        Replace the data of the cached lines and rescale, without rebuilding the
+        figure. With keep_limits, data that fits the current limits is blitted.
+        """
+        max_time = 0
+        min_time = float('inf')
+        time_bounds = {}
+        
+        for segment_name, segment_data in plot_data.items():
+            for trace in segment_data['traces']:
+                entry = self._line_cache.get((segment_name, trace.get('file_path'), trace.get('column')))
+                if entry is None:
+                    continue
+                
+                artist, index, offset = entry
+                x = self._get_time_values(trace, sampling_freq)
+                if len(x) > 0:
+                    x_min, x_max = self._time_bounds(x, time_bounds)
+                    max_time = max(max_time, x_max)
+                    min_time = min(min_time, x_min)
+                
+                y = processed[id(trace)]
+                self._line_values[artist][index] = (x, y, offset)
+                if not isinstance(artist, LineCollection):
+                    artist.set_data(x, y + offset if offset else y)
+        
+        # relim only sees lines; collections add their limits themselves
+        for ax in self._plot_axes:
+            ax.relim()
+            self._update_collection_limits(ax, time_bounds)
+        
+        # Same limits: only the lines need to be drawn again
+        if keep_limits and all(self._data_fits(ax) for ax in self._plot_axes):
+            self._downsample_lines()
+            self._blit_lines()
+            return
+        
+        # Rescale y to the new data; x gets the same margin as a full redraw
+        for ax in self._plot_axes:
+            ax.set_autoscaley_on(True)  # a toolbar zoom turns it off
+            ax.autoscale_view(scalex=False)
+            if min_time < float('inf') and max_time > 0:
+                ax.set_xlim(min_time, max_time + (max_time - min_time) * 0.1, emit=False)
+        
+        self._downsample_lines()
+        self.canvas.draw_idle()
+    
+    def _update_collection_limits(self, ax, time_bounds):
+        """Add the extent of the full values of the line collections on ax to its data limits."""
+        points = []
+        for artist, values in self._line_values.items():
+            if artist.axes is not ax or not isinstance(artist, LineCollection):
+                continue
+            
+            for x, y, offset in values:
+                if len(x) == 0 or len(y) == 0:
+                    continue
+                
+                # fmin/fmax skip NaN; a trace of only NaN adds nothing
+                y_min, y_max = np.fmin.reduce(y), np.fmax.reduce(y)
+                if y_min == y_min:
+                    x_min, x_max = self._time_bounds(x, time_bounds)
+                    points += [(x_min, y_min + offset), (x_max, y_max + offset)]
+        
+        if points:
+            ax.update_datalim(points)
+    
+    def _data_fits(self, ax):
+        """Whether the data of ax (after relim) lies within its current y limits."""
+        y_lo, y_hi = sorted(ax.get_ylim())
+        return y_lo <= ax.dataLim.y0 and ax.dataLim.y1 <= y_hi
+    
+    def _blit_lines(self):
+        """Draw only the lines over the saved axes backgrounds and blit the axes."""
+        if self._blit_backgrounds is None:
+            self._capture_backgrounds()
+        
+        lines_by_ax = {}
+        for artist in self._line_values:
+            lines_by_ax.setdefault(artist.axes, []).append(artist)
+        
+        # Restore every region before drawing: the padded regions of stacked
+        # axes overlap their neighbours
+        for ax in self._plot_axes:
+            self.canvas.restore_region(self._blit_backgrounds[ax])
+        for ax in self._plot_axes:
+            for artist in lines_by_ax.get(ax, []) + self._blit_overlays[ax]:
+                ax.draw_artist(artist)
+        for ax in self._plot_axes:
+            self.canvas.blit(self._blit_region(ax))
+    
+    def _blit_region(self, ax):
+        """The display box of ax, padded to include the outer half of its spines."""
+        width = max((spine.get_linewidth() for spine in ax.spines.values()), default=0)
+        return ax.bbox.padded(np.ceil(width * self.figure.dpi / 72) + 1)
+    
+    def _capture_backgrounds(self):
+        """
+        Render the figure without its lines and save the background of every axes.
+        The visible spines, the legend and texts inside an axes are drawn over
+        the lines, so they are left out of the background too and drawn again
+        after the lines.
+        """
+        renderer = self.canvas.get_renderer()
+        self._blit_overlays = {}
+        for ax in self._plot_axes:
+            overlays = [text for text in ax.texts
+                        if ax.bbox.overlaps(text.get_window_extent(renderer))]
+            overlays += [spine for spine in ax.spines.values() if spine.get_visible()]
+            if ax.get_legend() is not None:
+                overlays.append(ax.get_legend())
+            self._blit_overlays[ax] = sorted(overlays, key=lambda artist: artist.get_zorder())
+        
+        animated = list(self._line_values) + [artist for overlays in self._blit_overlays.values()
+                                               for artist in overlays]
+        for artist in animated:
+            artist.set_animated(True)
+        
+        self._capturing = True
+        try:
+            self.canvas.draw()
+        finally:
+            self._capturing = False
+            for artist in animated:
+                artist.set_animated(False)
+        
+        self._blit_backgrounds = {ax: self.canvas.copy_from_bbox(self._blit_region(ax))
+                                  for ax in self._plot_axes}
+    
+    def _on_draw(self, event):
+        """A full draw may change anything behind the lines: drop the backgrounds."""
+        if not self._capturing:
+            self._blit_backgrounds = None
+    
+    def _on_xlim_changed(self, ax):
+        """Reduce the lines of ax again for its new x range (zoom, pan)."""
+        self._downsample_lines([ax])
+    
+    def _downsample_lines(self, axes=None, scale=1.0):
+        """
+        Give the lines on axes (default: all) an M4 reduction of their values for
+        the visible x range, with about 4 samples per pixel times scale.
+        Lines whose time values are not sorted are drawn in full.
+        """
+        checked = {}  # Sortedness per time array
+        for artist, values in self._line_values.items():
+            ax = artist.axes
+            if ax is None or (axes is not None and ax not in axes):
+                continue
+            
+            x_lo, x_hi = sorted(ax.get_xlim())
+            n_pixels = max(int(ax.bbox.width * scale), 1)
+            
+            reduced = []
+            for x, y, offset in values:
+                is_sorted = checked.get(id(x))
+                if is_sorted is None:
+                    is_sorted = checked[id(x)] = bool(np.all(x[1:] >= x[:-1]))
+                
+                if is_sorted:
+                    x, y = _m4_downsample(x, y, x_lo, x_hi, n_pixels)
+                reduced.append((x, y + offset if offset else y))
+            
+            if isinstance(artist, LineCollection):
+                artist.set_segments([np.column_stack(xy) for xy in reduced])
+            else:
+                artist.set_data(*reduced[0])
+    
+    def _resolve_region(self, region):
+        """
+        Get (left color, right color, line style) for a region name. The first
+        region key contained in the name wins; names matching none get the defaults.
+        """
+        resolved = self._region_resolve_cache.get(region)
+        if resolved is None:
+            key = 'default'
+            if region:
+                name = region.lower()
+                key = next((k for k in self.left_colors if k in name), 'default')
+            resolved = (self.left_colors[key], self.right_colors.get(key, self.right_colors['default']),
+                        self.region_styles.get(key, self.region_styles['default']))
+            self._region_resolve_cache[region] = resolved
+        return resolved
+    
+    def _region_priority(self, region):
+        """Position of a region in _REGION_ORDER: the first entry its name contains."""
+        priority = self._region_priority_cache.get(region)
+        if priority is None:
+            name = region.lower()
+            priority = next((i for i, reg in enumerate(self._REGION_ORDER) if reg in name),
+                            len(self._REGION_ORDER))
+            self._region_priority_cache[region] = priority
+        return priority
+    
+    def _trace_side(self, trace):
+        """Get the side ('l' or 'r') of a trace, or None if its column has none."""
+        if 'side' in trace:
+            return trace['side']
+        
+        # Traces built without a side: parse it from the column name
+        match = self._SIDE_RE.search(trace.get('column') or '')
+        return match.group(2) if match else None
+    
+    def _time_bounds(self, x, bounds):
+        """Get (min, max) of a time array, computed once per array in bounds."""
+        entry = bounds.get(id(x))
+        if entry is None:
+            entry = bounds[id(x)] = (x.min(), x.max())
+        return entry
+    
+    def _get_time_values(self, trace, sampling_freq):
+        """Get time values of a trace or generate based on sampling frequency."""
         try:
-            if df is None:
+            y = trace.get('y')
+            if y is None:
                 return np.array([])
                 
-            if 'Time' in df.columns:
-                return df['Time'].values
+            if trace.get('t') is not None:
+                return trace['t']
             else:
                 # Generate time values based on length and sampling frequency
-                return np.arange(len(df)) / sampling_freq
+                return self.parent.data_manager.get_time_array(len(y), sampling_freq)
         except Exception as e:
             print(f"Error in _get_time_values: {str(e)}")
             return np.array([])
     
-    def _process_dataframe(self, df, normalization, baseline_start, baseline_duration, sampling_freq):
-        """Process the dataframe according to normalization settings."""
+    def _group_by_length(self, traces):
+        """Group traces by the length of their values: {length: [traces]}."""
+        by_length = {}
+        for trace in traces:
+            by_length.setdefault(len(trace['y']), []).append(trace)
+        return by_length
+    
+    def _build_trace_stack(self, traces):
+        """
+        Stack equal-length trace values as columns of a column-major float32 array.
+        The stack lives in a buffer reused across calls, so it is only valid
+        until the next call; results must be written elsewhere.
+        """
+        n_samples, n_traces = len(traces[0]['y']), len(traces)
+        size = n_samples * n_traces
+        
+        # Grow geometrically so repeated replots stop allocating
+        if self._stack_buf is None or self._stack_buf.size < size:
+            previous = 0 if self._stack_buf is None else self._stack_buf.size
+            self._stack_buf = np.empty(max(size, 2 * previous), dtype=np.float32)
+        
+        # A contiguous prefix of the flat buffer keeps the stack F-contiguous
+        stack = self._stack_buf[:size].reshape((n_samples, n_traces), order='F')
+        for j, trace in enumerate(traces):
+            stack[:, j] = trace['y']
+        return stack
+    
+    def _process_traces(self, plot_data, normalization, baseline_start, baseline_duration, sampling_freq):
+        """
+        Process the values of all traces according to normalization settings.
+        Traces of equal length are normalized together as one stack, and
+        results from the previous call with the same settings are reused.
+        Returns {id(trace): values}.
+        """
+        traces = [trace for segment_data in plot_data.values()
+                  for trace in segment_data['traces'] if trace.get('y') is not None]
+        processed = {id(trace): trace['y'] for trace in traces}
+        
+        if normalization not in ('mean', 'baseline'):
+            return processed
+        
+        # Cached results are only valid for the settings they were made with
+        settings = (normalization, baseline_start, baseline_duration, sampling_freq)
+        if settings != self._processed_settings:
+            self._processed_settings = settings
+            self._processed_cache = {}
+        
+        # Keep the cache to the current traces: {id(values): (values, result)}
+        previous, cache = self._processed_cache, {}
+        pending = []
+        for trace in traces:
+            entry = previous.get(id(trace['y']))
+            if entry is not None and entry[0] is trace['y']:
+                processed[id(trace)] = entry[1]
+                cache[id(trace['y'])] = entry
+            else:
+                pending.append(trace)
+        self._processed_cache = cache
+        
         try:
-            if df is None:
-                return None
+            data_manager = self.parent.data_manager
+            
+            for group in self._group_by_length(pending).values():
+                stack = self._build_trace_stack(group)
+                labels = [trace.get('column') for trace in group]
                 
-            if normalization == 'none':
-                return df
-            elif normalization == 'mean':
-                return self.parent.data_manager.normalize_by_mean(df)
-            elif normalization == 'baseline':
-                return self.parent.data_manager.normalize_baseline(df, baseline_start, baseline_duration, sampling_freq)
-            return df
+                if normalization == 'mean':
+                    result = data_manager.normalize_stack_by_mean(stack, labels)
+                else:
+                    result = data_manager.normalize_stack_baseline(
+                        stack, baseline_start, baseline_duration, sampling_freq, labels)
+                
+                for j, trace in enumerate(group):
+                    processed[id(trace)] = result[:, j]
+                    cache[id(trace['y'])] = (trace['y'], result[:, j])
         except Exception as e:
-            print(f"Error in _process_dataframe: {str(e)}")
-            return df
+            print(f"Error in _process_traces: {str(e)}")
+        
+        return processed
     
     def apply_gaussian_filter(self, sigma_percent):
-        """Apply gaussian filter to all traces in the current plot."""
+        """
+        Apply gaussian filter to all traces in the current plot.
+        Rapid calls are coalesced: only the last sigma is applied, once.
+        """
+        self._pending_sigma = sigma_percent
+        self._replot_timer.start(50)
+    
+    def _do_replot(self):
+        """Filter the current traces with the pending sigma and redraw."""
+        sigma_percent = self._pending_sigma
         if not self.current_dfs:
             return
         
         try:
+            traces = [trace for segment_data in self.current_dfs.values()
+                      for trace in segment_data.get('traces', []) if trace.get('y') is not None]
+            
+            # Filter traces of equal length together: one SciPy call per stack,
+            # with sigma in data points. The output is kept by the filtered
+            # traces, so it cannot be the reused stack buffer.
+            filtered = {}
+            for group in self._group_by_length(traces).values():
+                stack = self._build_trace_stack(group)
+                sigma = (sigma_percent / 100) * len(stack)
+                filtered_stack = np.empty_like(stack)
+                gaussian_filter1d(stack, sigma, axis=0, output=filtered_stack)
+                
+                for j, trace in enumerate(group):
+                    filtered[id(trace)] = filtered_stack[:, j]
+            
             filtered_dfs = {}
             
             for segment_name, segment_data in self.current_dfs.items():
                 filtered_traces = []
                 
                 for trace in segment_data.get('traces', []):
-                    file_path = trace.get('file_path')
-                    column = trace.get('column')
-                    region = trace.get('region')
-                    df = trace.get('df')
-                    
-                    if df is None or column not in df.columns:
+                    if id(trace) not in filtered:
                         continue
                     
-                    # Calculate sigma in data points
-                    data_length = len(df)
-                    sigma = (sigma_percent / 100) * data_length
-                    
-                    # Make a copy to avoid modifying the original
-                    df_copy = df.copy()
-                    
-                    # Apply filter to this column
-                    if column in df_copy.columns:
-                        df_copy[column] = gaussian_filter1d(df_copy[column].values, sigma)
-                    
-                    # Add filtered trace
+                    # Add filtered trace (float32, like the trace arrays from
+                    # the data manager)
                     filtered_traces.append({
-                        'file_path': file_path,
-                        'column': column,
-                        'region': region,
-                        'df': df_copy
+                        'file_path': trace.get('file_path'),
+                        'column': trace.get('column'),
+                        'region': trace.get('region'),
+                        'y': filtered[id(trace)],
+                        't': trace.get('t'),
+                        'side': self._trace_side(trace)
                     })
                 
                 # Add to filtered data
@@ -461,13 +882,17 @@ class PlotCanvas(QWidget):
                 self.current_view,
                 self.baseline_start,
                 self.baseline_duration,
-                self.parent.data_manager.sampling_freq
+                self.parent.data_manager.sampling_freq,
+                keep_limits=True
             )
         except Exception as e:
-            print(f"Error in apply_gaussian_filter: {str(e)}")
+            print(f"Error in _do_replot: {str(e)}")
     
     def reset_filters(self):
         """Reset all filters to show original data."""
+        # Drop a filter that has not been applied yet
+        self._replot_timer.stop()
+        
         if not self.current_dfs:
             return
         
@@ -483,15 +908,18 @@ class PlotCanvas(QWidget):
                     region = trace.get('region')
                     
                     # Get original data from data manager
-                    if file_path in self.parent.data_manager.loaded_files:
-                        original_df = self.parent.data_manager.loaded_files[file_path]['original'].copy()
+                    data_manager = self.parent.data_manager
+                    if file_path in data_manager.loaded_files:
+                        original_y = data_manager.loaded_files[file_path]['arrays'][column]
                         
                         # Add original trace
                         original_traces.append({
                             'file_path': file_path,
                             'column': column,
                             'region': region,
-                            'df': original_df
+                            'y': original_y,
+                            't': data_manager.get_time_values(file_path),
+                            'side': self._trace_side(trace)
                         })
                 
                 # Add to original data
@@ -513,7 +941,12 @@ class PlotCanvas(QWidget):
     def save_figure(self, filename):
         """Save the current figure to a file."""
         try:
-            self.figure.savefig(filename, format='pdf', dpi=300, bbox_inches='tight')
+            # Reduce the lines for the export resolution rather than the screen's
+            self._downsample_lines(scale=300 / self.figure.dpi)
+            try:
+                self.figure.savefig(filename, format='pdf', dpi=300, bbox_inches='tight')
+            finally:
+                self._downsample_lines()
             return True
         except Exception as e:
             print(f"Error saving figure: {str(e)}")
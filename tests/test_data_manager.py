@@ -0,0 +1,32 @@
+import unittest
+
+import numpy as np
+
+from data_manager import DataManager
+
+
+class NormalizeStackByMeanTest(unittest.TestCase):
+    
+    def setUp(self):
+        self.data_manager = DataManager()
+    
+    def test_scales_columns_to_percent_of_mean(self):
+        stack = np.array([[1, 2], [3, 6]], dtype=np.float32)
+        
+        result = self.data_manager.normalize_stack_by_mean(stack)
+        
+        self.assertEqual(result.dtype, np.float32)
+        np.testing.assert_allclose(result, [[50, 50], [150, 150]])
+    
+    def test_leaves_zero_mean_column_unchanged(self):
+        stack = np.array([[-1, 1], [1, 3], [0, 2]], dtype=np.float32)
+        
+        with self.assertLogs(level='WARNING'):
+            result = self.data_manager.normalize_stack_by_mean(stack, ['zero', 'ok'])
+        
+        np.testing.assert_array_equal(result[:, 0], [-1, 1, 0])
+        np.testing.assert_allclose(result[:, 1], [50, 150, 100])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+import importlib.util
+import os
+import sys
+import unittest
+from unittest import mock
+
+import numpy as np
+
+import _kernels
+
+
+def _load_fallback():
+    """Import a second copy of _kernels as if Numba were not installed."""
+    path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '_kernels.py')
+    spec = importlib.util.spec_from_file_location('_kernels_numpy', path)
+    module = importlib.util.module_from_spec(spec)
+    with mock.patch.dict(sys.modules, {'numba': None}):
+        spec.loader.exec_module(module)
+    return module
+
+
+fallback = _load_fallback()
+
+
+class FallbackTest(unittest.TestCase):
+    
+    def test_fallback_does_not_use_numba(self):
+        self.assertFalse(fallback.HAVE_NUMBA)
+
+
+@unittest.skipUnless(_kernels.HAVE_NUMBA, "Numba is not installed")
+class DffKernelTest(unittest.TestCase):
+    
+    def _compare(self, arr, start, end):
+        out = np.empty(arr.shape, dtype=arr.dtype, order='F')
+        expected_out = np.empty_like(out)
+        
+        f0 = _kernels.dff_kernel(arr, start, end, out)
+        expected_f0 = fallback.dff_kernel(arr, start, end, expected_out)
+        
+        np.testing.assert_allclose(f0, expected_f0, rtol=1e-5)
+        np.testing.assert_allclose(out, expected_out, rtol=1e-5, atol=1e-4)
+        return f0, out
+    
+    def test_matches_fallback(self):
+        rng = np.random.default_rng(0)
+        arr = np.asfortranarray(100 + rng.normal(size=(200, 6)), dtype=np.float32)
+        arr[5, 2] = np.nan
+        
+        self._compare(arr, 0, 50)
+    
+    def test_zero_baseline_column_is_copied(self):
+        arr = np.asfortranarray([[-1, 10], [1, 20], [5, 30]], dtype=np.float32)
+        
+        f0, out = self._compare(arr, 0, 2)
+        
+        self.assertEqual(f0[0], 0)
+        np.testing.assert_array_equal(out[:, 0], arr[:, 0])
+    
+    def test_empty_input(self):
+        arr = np.empty((0, 3), dtype=np.float32, order='F')
+        
+        f0, out = self._compare(arr, 0, 50)
+        
+        self.assertEqual(f0.shape, (3,))
+        self.assertTrue(np.isnan(f0).all())
+        self.assertEqual(out.shape, (0, 3))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+import os
+import unittest
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+import numpy as np
+from PyQt5.QtWidgets import QApplication, QWidget
+
+from data_manager import DataManager
+from plot_canvas import PlotCanvas
+
+
+class _Host(QWidget):
+    """Stand-in for the main window: PlotCanvas only needs its data manager."""
+    
+    def __init__(self):
+        super().__init__()
+        self.data_manager = DataManager()
+
+
+def _plot_data(segments=('a1', 'a2', 't1'), regions=('soma', 'axon'), n=500, seed=0):
+    """Plot data with one left and one right trace per segment and region."""
+    rng = np.random.default_rng(seed)
+    t = np.arange(n) / 5.0
+    plot_data = {}
+    for segment in segments:
+        traces = []
+        for side in 'lr':
+            for region in regions:
+                traces.append({
+                    'file_path': f'/data/RP3_May_14_n5_{region}.csv',
+                    'column': f'Mean({segment}{side})',
+                    'y': (100 + rng.normal(size=n).cumsum()).astype(np.float32),
+                    't': t,
+                    'region': region,
+                    'side': side,
+                })
+        plot_data[segment] = {'traces': traces}
+    return plot_data
+
+
+class PlotCanvasTest(unittest.TestCase):
+    
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication([])
+    
+    def setUp(self):
+        self.host = _Host()
+        self.canvas = PlotCanvas(self.host)
+        self.canvas.resize(800, 600)
+    
+    def tearDown(self):
+        self.canvas.deleteLater()
+        self.host.deleteLater()
+    
+    def test_stacked_view_keeps_x_axis_on_last_segment(self):
+        self.canvas.update_plot(_plot_data(), 'none', 'stacked')
+        
+        axes = self.canvas.figure.axes
+        self.assertEqual(len(axes), 3)
+        for ax in axes[:-1]:
+            self.assertFalse(ax.spines['bottom'].get_visible())
+            self.assertFalse(ax.xaxis.get_tick_params()['labelbottom'])
+        
+        last = axes[-1]
+        self.assertTrue(last.spines['bottom'].get_visible())
+        self.assertTrue(last.xaxis.get_tick_params().get('labelbottom', True))
+        self.assertTrue(any(label.get_text() for label in last.get_xticklabels()))
+        self.assertEqual(last.get_xlabel(), 'Time (s)')
+    
+    def test_new_data_rescales_zoomed_axis_like_full_rebuild(self):
+        plot_data = _plot_data()
+        self.canvas.update_plot(plot_data, 'baseline', 'overlay', baseline_start=0)
+        ax = self.canvas.figure.axes[0]
+        # What a toolbar zoom does: fixed limits, autoscaling switched off
+        ax.set_xlim(5, 10)
+        ax.set_ylim(0, 5)
+        self.assertFalse(ax.get_autoscaley_on())
+        
+        self.canvas.update_plot(plot_data, 'baseline', 'overlay', baseline_start=20)
+        
+        rebuilt = PlotCanvas(self.host)
+        rebuilt.update_plot(plot_data, 'baseline', 'overlay', baseline_start=20)
+        self.assertIs(self.canvas.figure.axes[0], ax)
+        np.testing.assert_allclose(ax.get_ylim(), rebuilt.figure.axes[0].get_ylim())
+        np.testing.assert_allclose(ax.get_xlim(), rebuilt.figure.axes[0].get_xlim())
+        rebuilt.deleteLater()
+
+
+if __name__ == '__main__':
+    unittest.main()